@@ -0,0 +1,9 @@
+"""
+Smart contract ABI, parsed once at import.
+"""
+import pathlib
+import orjson
+
+
+# Resolved next to this file so imports work from any working directory
+ABI = orjson.loads(pathlib.Path(__file__).with_name("abi.json").read_bytes())
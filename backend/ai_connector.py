@@ -1,5 +1,14 @@
 import httpx
+import orjson
+import cachetools
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import weakref
 from config import settings
+from breakers import ai_breaker, CircuitBreakerError, transient_retry
 import sys
 import os
 
@@ -7,15 +16,90 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from credibility_engine import CredibilityEngine
 
+log = logging.getLogger("thinkbaby.ai")
+
+# Credibility Engine verdict -> frontend ai_label
+VERDICT_MAP = {
+    "TRUE": "Likely True",
+    "FALSE": "Likely False",
+    "UNCERTAIN": "Uncertain",
+    "UNVERIFIED": "Unverified",
+    "BREAKING": "Breaking News"
+}
+
 # Initialize credibility engine
 credibility_engine = CredibilityEngine()
 
+# Shared client for the external AI service fallback
+_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(
+        connect=settings.ai_connect_timeout_s,
+        read=settings.ai_timeout_s,
+        write=settings.ai_timeout_s,
+        pool=1.0
+    ),
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+)
+
+
+# Analysis memo: LFU-evicted, entries hold (expires_at, result).
+# Expired entries are kept so they can be served stale while the AI breaker is open.
+ANALYSIS_CACHE_TTL = 600  # seconds
+_analysis_cache = cachetools.LFUCache(maxsize=4096)
+
+# Single-flight locks so concurrent requests for the same claim share one analysis
+_analysis_locks = weakref.WeakValueDictionary()
+
+
+async def close_client() -> None:
+    """Close the shared AI service HTTP client."""
+    await _client.aclose()
+
+
+@transient_retry
+async def _post_ai_service(text: str) -> httpx.Response:
+    """
+    POST claim to the external AI service, raising on HTTP errors.
+    Retried with backoff on transient errors; analysis is idempotent.
+    """
+    response = await _client.post(
+        settings.ai_service_url,
+        content=orjson.dumps({"claim": text}),
+        headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    return response
+
+
+def _unavailable_result(summary: str) -> dict:
+    """Safe neutral analysis returned when no AI backend is available."""
+    return {
+        "ai_label": "Uncertain",
+        "risk_score": 0.5,
+        "summary": summary
+    }
+
+
+def _analysis_key(text: str, source_url: str, rag_context: str,
+                  web_context: str, votes_data: dict) -> bytes:
+    """Digest of every analysis input, so vote changes produce a fresh score."""
+    material = "|".join([
+        text,
+        source_url or "",
+        rag_context or "",
+        web_context or "",
+        json.dumps(votes_data, sort_keys=True) if votes_data else ""
+    ])
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).digest()
+
 
 async def analyze_claim(text: str, source_url: str = None, rag_context: str = None, 
                        web_context: str = None, votes_data: dict = None) -> dict:
     """
     Analyze claim using the integrated Credibility Engine.
     Falls back to external AI service if credibility engine fails.
+    Results are memoized per input for ANALYSIS_CACHE_TTL seconds.
     
     Returns AI analysis in the format expected by the frontend:
     {
@@ -24,10 +108,54 @@ async def analyze_claim(text: str, source_url: str = None, rag_context: str = No
         "summary": str        # Human-readable explanation
     }
     """
+    result, _ = await analyze_claim_with_status(text, source_url, rag_context, web_context, votes_data)
+    return result
+
+
+async def analyze_claim_with_status(text: str, source_url: str = None, rag_context: str = None,
+                                    web_context: str = None, votes_data: dict = None) -> tuple:
+    """
+    analyze_claim, also reporting whether the result is a real analysis.
+    Returns (result, cacheable); cacheable is False for stale or unavailable
+    fallbacks, which callers must not persist either.
+    """
+    key = _analysis_key(text, source_url, rag_context, web_context, votes_data)
+    
+    cached = _analysis_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1], True
+    
+    lock = _analysis_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _analysis_locks[key] = lock
+    
+    async with lock:
+        # Another request may have filled the cache while we waited
+        cached = _analysis_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1], True
+        
+        stale = cached[1] if cached else None
+        result, cacheable = await _analyze_claim_uncached(
+            text, source_url, rag_context, web_context, votes_data, stale
+        )
+        
+        if cacheable:
+            _analysis_cache[key] = (time.monotonic() + ANALYSIS_CACHE_TTL, result)
+        
+        return result, cacheable
+
+
+async def _analyze_claim_uncached(text, source_url, rag_context, web_context,
+                                  votes_data, stale=None):
+    """
+    Run the analysis without memoization.
+    Returns (result, cacheable); safe fallbacks are not cacheable.
+    """
     try:
         # Use Credibility Engine for analysis
-        print(f"🔍 Analyzing claim with Credibility Engine...")
-        print(f"   Claim: {text[:100]}...")
+        log.debug("Analyzing claim with Credibility Engine: %.100s", text)
         
         result = await credibility_engine.score(
             claim=text,
@@ -42,24 +170,19 @@ async def analyze_claim(text: str, source_url: str = None, rag_context: str = No
         risk_score = 1.0 - result.final_score
         
         # Map verdict to ai_label
-        verdict_map = {
-            "TRUE": "Likely True",
-            "FALSE": "Likely False",
-            "UNCERTAIN": "Uncertain",
-            "UNVERIFIED": "Unverified",
-            "BREAKING": "Breaking News"
-        }
-        
-        ai_label = verdict_map.get(result.verdict, "Uncertain")
+        ai_label = VERDICT_MAP.get(result.verdict, "Uncertain")
         
         # Build summary with key metrics
-        summary = f"{result.explanation} | "
-        summary += f"Confidence: {result.confidence:.0%} | "
-        summary += f"Risk: {result.risk_level.upper()}"
+        parts = [
+            result.explanation,
+            f"Confidence: {result.confidence:.0%}",
+            f"Risk: {result.risk_level.upper()}"
+        ]
         
         if result.flags:
-            top_flags = result.flags[:3]
-            summary += f" | Signals: {', '.join(top_flags)}"
+            parts.append("Signals: " + ", ".join(result.flags[:3]))
+        
+        summary = " | ".join(parts)
         
         analysis_result = {
             "ai_label": ai_label,
@@ -67,41 +190,43 @@ async def analyze_claim(text: str, source_url: str = None, rag_context: str = No
             "summary": summary
         }
         
-        print(f"✅ Credibility Engine Analysis:")
-        print(f"   Verdict: {result.verdict}")
-        print(f"   AI Label: {ai_label}")
-        print(f"   Risk Score: {risk_score:.2%}")
-        print(f"   Summary: {summary[:100]}...")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Credibility Engine analysis: verdict=%s label=%s risk=%.2f summary=%.100s",
+                result.verdict, ai_label, risk_score, summary
+            )
         
-        return analysis_result
+        return analysis_result, True
     
     except Exception as e:
-        print(f"⚠️ Credibility Engine failed, trying external AI service: {e}")
+        log.warning("Credibility Engine failed, trying external AI service: %s", e)
         
         # Fallback to external AI service
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    settings.ai_service_url,
-                    json={"claim": text}
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Validate response format
-                return {
-                    "ai_label": data.get("ai_label", "Uncertain"),
-                    "risk_score": data.get("risk_score", 0.5),
-                    "summary": data.get("summary", "Analysis completed")
-                }
+            response = await ai_breaker.call(_post_ai_service, text)
+            
+            data = orjson.loads(response.content)
+            
+            # Validate response format
+            return {
+                "ai_label": data.get("ai_label", "Uncertain"),
+                "risk_score": data.get("risk_score", 0.5),
+                "summary": data.get("summary", "Analysis completed")
+            }, True
+        
+        except CircuitBreakerError:
+            # AI service known to be down - skip the network call entirely,
+            # serving the last known analysis if we have one
+            if stale is not None:
+                return stale, False
+            return _unavailable_result(
+                "AI analysis unavailable - credibility engine failed and external service circuit is open"
+            ), False
         
         except Exception as fallback_error:
             # Both systems failed - return safe fallback
-            print(f"❌ AI service also failed: {fallback_error}")
-            return {
-                "ai_label": "Uncertain",
-                "risk_score": 0.5,
-                "summary": "AI analysis unavailable - both credibility engine and external service failed"
-            }
+            log.error("AI service also failed: %s", fallback_error)
+            return _unavailable_result(
+                "AI analysis unavailable - both credibility engine and external service failed"
+            ), False
 
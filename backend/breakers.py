@@ -0,0 +1,113 @@
+"""
+Circuit breakers and retry policy for external service calls.
+Breakers trip open after repeated failures so callers fail fast instead of
+waiting out timeouts. Retries go inside the breaker, so a breaker failure is
+only recorded once all retry attempts are exhausted.
+"""
+import asyncio
+import time
+import aiohttp
+import httpx
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """
+    Connection errors, timeouts, 429 and 5xx responses are worth retrying.
+    Covers httpx (our own clients) and aiohttp (web3's async provider).
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (httpx.TransportError, aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitBreakerError(Exception):
+    """Raised when a call is rejected because the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Minimal asyncio circuit breaker.
+
+    States:
+        closed    -> calls pass through, failures are counted
+        open      -> calls rejected immediately with CircuitBreakerError
+        half-open -> after reset_timeout, exactly one call is let through
+                     as a trial (others are rejected); success closes the
+                     breaker, failure re-opens it
+
+    Only exceptions matching is_failure (transport errors, 429, 5xx by
+    default) are counted; anything else means the service answered and is
+    re-raised without tripping the breaker.
+    """
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30, is_failure=_is_transient):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.fail_counter = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def current_state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Await func(*args, **kwargs) through the breaker.
+        Raises CircuitBreakerError without calling func if the breaker is open,
+        or if it is half-open and another call is already the trial.
+        """
+        state = self.current_state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise CircuitBreakerError(f"{self.name} circuit breaker is open")
+
+        is_trial = state == "half-open"
+        if is_trial:
+            self._trial_in_flight = True
+
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as exc:
+            if self.is_failure(exc):
+                self._on_failure()
+            else:
+                self._on_success()
+            raise
+        finally:
+            if is_trial:
+                self._trial_in_flight = False
+
+        self._on_success()
+        return result
+
+    def _on_failure(self):
+        self.fail_counter += 1
+        if self.current_state == "half-open" or self.fail_counter >= self.fail_max:
+            self.opened_at = time.monotonic()
+
+    def _on_success(self):
+        self.fail_counter = 0
+        self.opened_at = None
+
+
+ai_breaker = CircuitBreaker("ai_service", fail_max=5, reset_timeout=30)
+pinata_breaker = CircuitBreaker("pinata", fail_max=5, reset_timeout=60)
+
+
+# Only apply to idempotent operations (reads, analysis) - never to uploads
+transient_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.1, max=1.0),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
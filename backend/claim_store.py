@@ -0,0 +1,141 @@
+"""
+Persistent claim registry.
+Maps claimHash -> CID and metadata in SQLite so entries survive restarts
+and are shared by every uvicorn worker. Reads go through an in-process LRU.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+import aiosqlite
+from cachetools import LRUCache
+
+
+log = logging.getLogger("thinkbaby.store")
+
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "claims.db")
+
+# SQLite's default limit on bound parameters per statement
+_MAX_SQL_VARS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    claim_hash   TEXT PRIMARY KEY,
+    content_cid  TEXT,
+    submitter    TEXT,
+    block_number INTEGER,
+    timestamp    INTEGER
+)
+"""
+
+
+@dataclass(slots=True)
+class ClaimRow:
+    """One registry entry; fields follow the claims table column order."""
+    claim_hash: str
+    content_cid: Optional[str]
+    submitter: str
+    block_number: int
+    timestamp: int
+
+
+class ClaimStore:
+    """
+    SQLite-backed claim registry with a write-through LRU cache of ClaimRows.
+    Rows still waiting for their content CID are never served from the cache:
+    the upload that fills it in may finish in another process.
+    """
+
+    def __init__(self, path: str = DB_FILE, cache_size: int = 10_000):
+        self.path = path
+        self._db: Optional[aiosqlite.Connection] = None
+        self._cache = LRUCache(maxsize=cache_size)
+        self.version = 0  # bumped on every put
+
+    async def open(self):
+        self._db = await aiosqlite.connect(self.path)
+        # WAL lets several worker processes read while one writes
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute(_SCHEMA)
+        await self._db.commit()
+        log.info("Claim store opened at %s", self.path)
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def get(self, claim_hash: str) -> Optional[ClaimRow]:
+        """Return the registry entry for claim_hash, or None."""
+        entry = self._cache.get(claim_hash)
+        if entry is not None and entry.content_cid is not None:
+            return entry
+
+        async with self._db.execute(
+            "SELECT claim_hash, content_cid, submitter, block_number, timestamp "
+            "FROM claims WHERE claim_hash = ?",
+            (claim_hash,)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if row is None:
+            return None
+
+        entry = ClaimRow(*row)
+        self._remember(entry)
+        return entry
+
+    async def get_many(self, claim_hashes: Iterable[str]) -> Dict[str, ClaimRow]:
+        """Look up several claims at once; missing hashes are omitted."""
+        found = {}
+        missing = []
+        for claim_hash in claim_hashes:
+            entry = self._cache.get(claim_hash)
+            if entry is not None and entry.content_cid is not None:
+                found[claim_hash] = entry
+            else:
+                missing.append(claim_hash)
+
+        for i in range(0, len(missing), _MAX_SQL_VARS):
+            chunk = missing[i:i + _MAX_SQL_VARS]
+            placeholders = ",".join("?" * len(chunk))
+            async with self._db.execute(
+                "SELECT claim_hash, content_cid, submitter, block_number, timestamp "
+                f"FROM claims WHERE claim_hash IN ({placeholders})",
+                chunk
+            ) as cursor:
+                async for row in cursor:
+                    entry = ClaimRow(*row)
+                    self._remember(entry)
+                    found[entry.claim_hash] = entry
+
+        return found
+
+    async def put(self, entry: ClaimRow):
+        """Insert or replace an entry (write-through)."""
+        await self._db.execute(
+            "INSERT OR REPLACE INTO claims "
+            "(claim_hash, content_cid, submitter, block_number, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                entry.claim_hash,
+                entry.content_cid,
+                entry.submitter,
+                entry.block_number,
+                entry.timestamp
+            )
+        )
+        await self._db.commit()
+        self._remember(entry)
+        self.version += 1
+
+    def _remember(self, entry: ClaimRow):
+        """Cache a row once it is final; CID-less rows are re-read from SQLite."""
+        if entry.content_cid is not None:
+            self._cache[entry.claim_hash] = entry
+        else:
+            self._cache.pop(entry.claim_hash, None)
+
+
+claim_store = ClaimStore()
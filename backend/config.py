@@ -5,23 +5,36 @@ from typing import List
 class Settings(BaseSettings):
     # Blockchain
     sepolia_rpc_url: str
+    sepolia_ws_url: str = ""  # Optional wss:// endpoint for a persistent connection
+    sepolia_rpc_fallback_urls: str = ""  # Optional comma-separated extra HTTP endpoints
     contract_address: str
     backend_private_key: str
+    indexer_start_block: int = 0  # Contract deployment block; must be set or the first scan starts at genesis
     
     # AI Service
     ai_service_url: str
+    ai_timeout_s: float = 5.0          # Read/write timeout, ~p95 of AI service
+    ai_connect_timeout_s: float = 2.0
     
     # IPFS
     pinata_api_key: str
     pinata_secret_key: str
+    pinata_timeout_s: float = 8.0      # Read/write timeout, ~p95 of Pinata
+    pinata_connect_timeout_s: float = 2.0
     
     # App
     cors_origins: str = "http://localhost:3000"
+    log_level: str = "INFO"
     
     class Config:
         env_file = ".env"
         case_sensitive = False
     
+    @property
+    def rpc_urls(self) -> List[str]:
+        fallbacks = [url.strip() for url in self.sepolia_rpc_fallback_urls.split(",") if url.strip()]
+        return [self.sepolia_rpc_url] + fallbacks
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
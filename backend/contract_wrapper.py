@@ -2,51 +2,276 @@
 Contract wrapper functions for clean blockchain interaction.
 All contract calls should go through these functions.
 """
-import json
-from web3 import Web3
+import asyncio
+import functools
+import logging
+import threading
+import time
+import requests
+from cachetools import LRUCache, TTLCache
+from requests.adapters import HTTPAdapter
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
+from web3.exceptions import ContractLogicError
 from eth_account import Account
 from config import settings
 from utils import hash_to_bytes32
+from abi import ABI
+from rpc_pool import EndpointPool, PooledHTTPProvider, AsyncPooledHTTPProvider
+from breakers import transient_retry
+
+
+log = logging.getLogger("thinkbaby.contract")
+
+
+def _build_provider():
+    """
+    Prefer a persistent WebSocket connection when SEPOLIA_WS_URL is set;
+    otherwise use HTTP with a pooled keep-alive session so calls reuse
+    one TCP/TLS connection instead of handshaking per request. With
+    fallback URLs configured, requests go to the fastest healthy endpoint.
+    """
+    if settings.sepolia_ws_url:
+        return Web3.WebsocketProvider(settings.sepolia_ws_url)
+    
+    if len(rpc_pool.urls) > 1:
+        return PooledHTTPProvider(rpc_pool, session=http_session)
+    
+    return Web3.HTTPProvider(settings.sepolia_rpc_url, session=http_session)
+
+
+def _build_async_provider():
+    if len(rpc_pool.urls) > 1:
+        return AsyncPooledHTTPProvider(rpc_pool)
+    
+    return AsyncHTTPProvider(settings.sepolia_rpc_url)
+
+
+# Pooled keep-alive session for HTTP JSON-RPC (provider + batch requests)
+http_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+http_session.mount("https://", _adapter)
+http_session.mount("http://", _adapter)
+
+# Primary RPC URL plus any SEPOLIA_RPC_FALLBACK_URLS, ranked by latency
+rpc_pool = EndpointPool(settings.rpc_urls)
 
 
 # Initialize Web3
-w3 = Web3(Web3.HTTPProvider(settings.sepolia_rpc_url))
+w3 = Web3(_build_provider())
+
+# Async Web3 for concurrent reads from the event loop
+aw3 = AsyncWeb3(_build_async_provider())
 
 # Load account
 account = Account.from_key(settings.backend_private_key)
 
 # Load contract
-with open("abi.json", "r") as f:
-    contract_abi = json.load(f)
-
 contract = w3.eth.contract(
     address=Web3.to_checksum_address(settings.contract_address),
-    abi=contract_abi
+    abi=ABI
+)
+
+async_contract = aw3.eth.contract(
+    address=Web3.to_checksum_address(settings.contract_address),
+    abi=ABI
 )
 
+# Max block span per eth_getLogs request (common provider limit)
+LOG_BLOCK_RANGE = 2000
+LOG_WINDOWS_IN_FLIGHT = 8
 
-def claim_exists(claim_hash: str) -> bool:
-    """Check if claim exists on-chain."""
-    hash_bytes = hash_to_bytes32(claim_hash)
-    return contract.functions.claimExists(hash_bytes).call()
 
+# Contract state caches. Claim existence is monotonic, so True is kept
+# indefinitely; False and unregistered roles (0) expire quickly because a
+# wallet transaction can flip them at any time. Registered roles rarely change.
+# A cached False can lag a wallet registration by up to 30s, so routes that
+# 404 or act on a miss look past it with trust_missing=False.
+_exists_cache = LRUCache(maxsize=50_000)
+_missing_cache = TTLCache(maxsize=10_000, ttl=30)
+_role_cache = TTLCache(maxsize=10_000, ttl=300)
+_unregistered_role_cache = TTLCache(maxsize=10_000, ttl=30)
+_cache_lock = threading.Lock()  # sync reads run on executor threads
+_cache_stats = {"hits": 0, "misses": 0}
 
-def get_votes(claim_hash: str) -> dict:
+
+def _cache_lookup(claim_hash: str, trust_missing: bool = True):
     """
-    Get total vote counts (validator + user votes combined).
-    Returns dict with true_votes, false_votes, block_number.
+    Return cached existence for a claim, or None on a miss.
+    With trust_missing=False a cached "missing" counts as a miss.
     """
-    hash_bytes = hash_to_bytes32(claim_hash)
-    block_number = w3.eth.block_number
-    
-    if not claim_exists(claim_hash):
+    with _cache_lock:
+        if claim_hash in _exists_cache or (trust_missing and claim_hash in _missing_cache):
+            _cache_stats["hits"] += 1
+            return claim_hash in _exists_cache
+        _cache_stats["misses"] += 1
+        return None
+
+
+def _cache_store(claim_hash: str, exists: bool):
+    with _cache_lock:
+        if exists:
+            _exists_cache[claim_hash] = True
+            _missing_cache.pop(claim_hash, None)
+        else:
+            _missing_cache[claim_hash] = False
+
+
+def mark_claim_exists(claim_hash: str):
+    """Record a claim seen in a ClaimRegistered event or a confirmed tx."""
+    _cache_store(claim_hash, True)
+
+
+def invalidate_role(wallet_address: str):
+    """Drop a cached role, e.g. after a RoleRegistered transaction."""
+    checksum_address = Web3.to_checksum_address(wallet_address)
+    with _cache_lock:
+        _role_cache.pop(checksum_address, None)
+        _unregistered_role_cache.pop(checksum_address, None)
+
+
+def cache_stats() -> dict:
+    """Sizes and hit/miss counters for the contract state caches."""
+    with _cache_lock:
         return {
-            "true_votes": 0,
-            "false_votes": 0,
-            "block_number": block_number
+            "claims_exist": len(_exists_cache),
+            "claims_missing": len(_missing_cache),
+            "roles": len(_role_cache) + len(_unregistered_role_cache),
+            **_cache_stats
         }
+
+
+@functools.lru_cache(maxsize=16384)
+def _h2b(claim_hash: str) -> bytes:
+    """Memoized hash_to_bytes32; the same hashes are read repeatedly."""
+    return hash_to_bytes32(claim_hash)
+
+
+class RPCBatchError(Exception):
+    """A single request inside a JSON-RPC batch returned an error."""
+
+
+def rpc_batch(calls) -> list:
+    """
+    Send several JSON-RPC requests in one HTTP POST.
+    calls: list of (method, params) tuples.
+    Returns raw results in call order; a failed item is returned as an
+    RPCBatchError instance instead of raising, so callers can handle each.
+    Raises requests.RequestException if no endpoint accepts the batch.
+    """
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    
+    last_exc = None
+    for url in rpc_pool.ranked():
+        start = time.monotonic()
+        try:
+            response = http_session.post(url, json=payload, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            rpc_pool.record_failure(url, e)
+            last_exc = e
+            continue
+        
+        # Providers without batch support answer with a single error object
+        # (or a non-JSON body); treat that as this endpoint failing the batch
+        try:
+            body = response.json()
+        except ValueError as e:
+            body = None
+            last_exc = requests.RequestException(f"Non-JSON batch response: {e}")
+        else:
+            if not isinstance(body, list):
+                last_exc = requests.RequestException(f"Batch request rejected: {body}")
+        if not isinstance(body, list):
+            rpc_pool.record_failure(url, last_exc)
+            continue
+        
+        rpc_pool.record_success(url, time.monotonic() - start)
+        break
+    else:
+        raise last_exc
+    
+    by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
     
-    true_votes, false_votes = contract.functions.getVotes(hash_bytes).call()
+    results = []
+    for i in range(len(calls)):
+        item = by_id.get(i)
+        if item is None:
+            results.append(RPCBatchError("Missing response"))
+        elif "error" in item:
+            results.append(RPCBatchError(item["error"].get("message", str(item["error"]))))
+        else:
+            results.append(item["result"])
+    
+    return results
+
+
+def rpc_batch_or_each(calls) -> list:
+    """
+    rpc_batch, falling back to one request per call when no endpoint
+    accepts batches. Same return shape as rpc_batch.
+    """
+    try:
+        return rpc_batch(calls)
+    except (requests.RequestException, ValueError) as e:
+        log.warning("JSON-RPC batch failed, sending %d calls individually: %s", len(calls), e)
+    
+    results = []
+    for method, params in calls:
+        response = w3.provider.make_request(method, params)
+        if "error" in response:
+            error = response["error"]
+            results.append(RPCBatchError(error.get("message", str(error)) if isinstance(error, dict) else str(error)))
+        else:
+            results.append(response["result"])
+    return results
+
+
+def contract_call_request(fn_name: str, args: list, block='latest') -> tuple:
+    """
+    Build an eth_call (method, params) tuple for rpc_batch.
+    """
+    return ("eth_call", [
+        {"to": contract.address, "data": contract.encodeABI(fn_name=fn_name, args=args)},
+        block
+    ])
+
+
+async def async_claim_exists(claim_hash: str, trust_missing: bool = True) -> bool:
+    """
+    Check if claim exists on-chain (cached, see _exists_cache).
+    Pass trust_missing=False right after a wallet registration, when a
+    cached "missing" from before the tx would be a false negative.
+    """
+    cached = _cache_lookup(claim_hash, trust_missing)
+    if cached is not None:
+        return cached
+    
+    hash_bytes = _h2b(claim_hash)
+    exists = await async_contract.functions.claimExists(hash_bytes).call()
+    _cache_store(claim_hash, exists)
+    return exists
+
+
+async def async_get_votes(claim_hash: str, block_number: int = None) -> dict:
+    """
+    Get total vote counts (validator + user votes combined).
+    Pass block_number to pin the read and skip the block_number RPC.
+    Returns dict with true_votes, false_votes, block_number.
+    Non-existent claims (getVotes reverts) report zero votes.
+    """
+    hash_bytes = _h2b(claim_hash)
+    if block_number is None:
+        block_number = await aw3.eth.block_number
+    
+    try:
+        true_votes, false_votes = await async_contract.functions.getVotes(hash_bytes).call(
+            block_identifier=block_number
+        )
+    except ContractLogicError:
+        true_votes, false_votes = 0, 0
     
     return {
         "true_votes": int(true_votes),
@@ -55,21 +280,22 @@ def get_votes(claim_hash: str) -> dict:
     }
 
 
-def get_validator_votes(claim_hash: str) -> dict:
+async def async_get_validator_votes(claim_hash: str, block_number: int = None) -> dict:
     """
     Get validator-only vote counts from contract.
+    Pass block_number to pin the read and skip the block_number RPC.
+    Non-existent claims (getValidatorVotes reverts) report zero votes.
     """
-    hash_bytes = hash_to_bytes32(claim_hash)
-    block_number = w3.eth.block_number
-    
-    if not claim_exists(claim_hash):
-        return {
-            "true_votes": 0,
-            "false_votes": 0,
-            "block_number": block_number
-        }
+    hash_bytes = _h2b(claim_hash)
+    if block_number is None:
+        block_number = await aw3.eth.block_number
     
-    validator_true, validator_false = contract.functions.getValidatorVotes(hash_bytes).call()
+    try:
+        validator_true, validator_false = await async_contract.functions.getValidatorVotes(hash_bytes).call(
+            block_identifier=block_number
+        )
+    except ContractLogicError:
+        validator_true, validator_false = 0, 0
     
     return {
         "true_votes": int(validator_true),
@@ -78,45 +304,200 @@ def get_validator_votes(claim_hash: str) -> dict:
     }
 
 
+def encode_get_votes(claim_hash: str) -> bytes:
+    """
+    Encode getVotes(hash) calldata for batching via Multicall3.
+    """
+    hash_bytes = _h2b(claim_hash)
+    calldata = contract.encodeABI(fn_name="getVotes", args=[hash_bytes])
+    return Web3.to_bytes(hexstr=calldata)
+
+
+def encode_get_validator_votes(claim_hash: str) -> bytes:
+    """
+    Encode getValidatorVotes(hash) calldata for batching via Multicall3.
+    """
+    hash_bytes = _h2b(claim_hash)
+    calldata = contract.encodeABI(fn_name="getValidatorVotes", args=[hash_bytes])
+    return Web3.to_bytes(hexstr=calldata)
+
+
+def decode_vote_counts(success: bool, return_data: bytes) -> dict:
+    """
+    Decode a (uint256, uint256) vote count result from Multicall3.
+    Failed calls (e.g. ClaimDoesNotExist reverts) decode as zero votes.
+    """
+    if not success or not return_data:
+        return {"true_votes": 0, "false_votes": 0}
+
+    true_votes, false_votes = w3.codec.decode(["uint256", "uint256"], return_data)
+
+    return {
+        "true_votes": int(true_votes),
+        "false_votes": int(false_votes)
+    }
+
+
 def get_role(wallet_address: str) -> int:
     """
     Get role of wallet address from contract.
     Returns: 0 = None, 1 = User, 2 = Validator
     """
     checksum_address = Web3.to_checksum_address(wallet_address)
-    role = contract.functions.getRole(checksum_address).call()
-    return int(role)
+    
+    role = _cached_role(checksum_address)
+    if role is not None:
+        return role
+    
+    role = int(contract.functions.getRole(checksum_address).call())
+    _store_role(checksum_address, role)
+    return role
+
+
+def _cached_role(checksum_address: str):
+    with _cache_lock:
+        role = _role_cache.get(checksum_address, _unregistered_role_cache.get(checksum_address))
+        _cache_stats["hits" if role is not None else "misses"] += 1
+    return role
+
+
+def _store_role(checksum_address: str, role: int):
+    with _cache_lock:
+        if role:
+            _role_cache[checksum_address] = role
+        else:
+            _unregistered_role_cache[checksum_address] = role
 
 
 def has_address_voted(claim_hash: str, voter_address: str) -> bool:
     """
     Check if address has voted on claim.
     """
-    hash_bytes = hash_to_bytes32(claim_hash)
+    hash_bytes = _h2b(claim_hash)
     checksum_address = Web3.to_checksum_address(voter_address)
     return contract.functions.hasAddressVoted(hash_bytes, checksum_address).call()
 
 
+def get_caller_metadata(claim_hash: str, caller_address: str) -> tuple:
+    """
+    Get (role, has_voted) for a caller in one JSON-RPC batch.
+    A cached role leaves only hasAddressVoted to send. If the batch fails
+    (some providers reject or rate-limit batches), falls back to plain calls.
+    """
+    checksum_address = Web3.to_checksum_address(caller_address)
+    role = _cached_role(checksum_address)
+    
+    calls = [contract_call_request("hasAddressVoted", [_h2b(claim_hash), checksum_address])]
+    if role is None:
+        calls.append(contract_call_request("getRole", [checksum_address]))
+    
+    try:
+        results = rpc_batch(calls)
+    except (requests.RequestException, ValueError):
+        results = [RPCBatchError("Batch request failed")]
+    if any(isinstance(result, RPCBatchError) for result in results):
+        return get_role(checksum_address), has_address_voted(claim_hash, checksum_address)
+    
+    has_voted = int(results[0], 16) != 0
+    if role is None:
+        role = int(results[1], 16)
+        _store_role(checksum_address, role)
+    return role, has_voted
+
+
 def get_claim_submitter(claim_hash: str) -> str:
     """
     Get address that submitted claim from contract.
     """
-    hash_bytes = hash_to_bytes32(claim_hash)
+    hash_bytes = _h2b(claim_hash)
     submitter = contract.functions.getClaimSubmitter(hash_bytes).call()
     return submitter
 
 
-def get_claim_registered_events(from_block=0, to_block='latest'):
+# Serializes nonce lookup + send so concurrent registrations don't reuse a nonce
+_tx_lock = threading.Lock()
+
+# Gas price moves slowly relative to block time; re-read at most every 10s
+_gas_price_cache = TTLCache(maxsize=1, ttl=10)
+
+
+def _gas_price(fresh: bool = False) -> int:
+    with _cache_lock:
+        price = None if fresh else _gas_price_cache.get("gas_price")
+    if price is None:
+        price = w3.eth.gas_price
+        with _cache_lock:
+            _gas_price_cache["gas_price"] = price
+    return price
+
+
+def send_register_claim(claim_hash: str):
     """
-    Query all ClaimRegistered events from blockchain.
-    Returns list of decoded events with claimHash and submitter.
+    Build, sign and send registerClaim from the backend wallet.
+    Returns the transaction hash without waiting for a receipt.
     """
-    event_filter = contract.events.ClaimRegistered.create_filter(
+    hash_bytes = _h2b(claim_hash)
+    
+    with _tx_lock:
+        try:
+            return _sign_and_send(hash_bytes, _gas_price())
+        except ValueError as e:
+            # A cached price can lag a fee spike; retry once at the live price
+            if "underpriced" not in str(e):
+                raise
+            return _sign_and_send(hash_bytes, _gas_price(fresh=True))
+
+
+def _sign_and_send(hash_bytes: bytes, gas_price: int):
+    # Build transaction
+    tx = contract.functions.registerClaim(hash_bytes).build_transaction({
+        'from': account.address,
+        'nonce': w3.eth.get_transaction_count(account.address, 'pending'),
+        'gas': 200000,
+        'gasPrice': gas_price
+    })
+    
+    # Sign transaction
+    signed_tx = account.sign_transaction(tx)
+    
+    # Send transaction
+    return w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+
+
+@transient_retry
+async def _get_claim_registered_logs(from_block: int, to_block: int):
+    """One eth_getLogs window; retried so a single 429/timeout doesn't sink a scan."""
+    return await async_contract.events.ClaimRegistered.get_logs(
         fromBlock=from_block,
         toBlock=to_block
     )
+
+
+async def get_claim_registered_events(from_block=0, to_block='latest'):
+    """
+    Query ClaimRegistered events from blockchain.
+    Splits the range into LOG_BLOCK_RANGE windows (provider eth_getLogs limit)
+    and fetches up to LOG_WINDOWS_IN_FLIGHT windows concurrently.
+    Returns list of decoded events with claimHash and submitter, in chain order.
+    """
+    if to_block == 'latest':
+        to_block = await aw3.eth.block_number
+    
+    windows = [
+        (start, min(start + LOG_BLOCK_RANGE - 1, to_block))
+        for start in range(from_block, to_block + 1, LOG_BLOCK_RANGE)
+    ]
+    
+    sem = asyncio.Semaphore(LOG_WINDOWS_IN_FLIGHT)
+    
+    async def fetch_window(window_start, window_end):
+        async with sem:
+            return await _get_claim_registered_logs(window_start, window_end)
+    
+    window_events = await asyncio.gather(*(fetch_window(a, b) for a, b in windows))
     
-    events = event_filter.get_all_entries()
+    events = [event for batch in window_events for event in batch]
+    events.sort(key=lambda e: (e['blockNumber'], e['logIndex']))
     
     decoded_events = []
     for event in events:
@@ -3,15 +3,110 @@ Event-based indexer for blockchain claims.
 Indexes ClaimRegistered events and builds Reddit-style feed.
 """
 import contract_wrapper
+import multicall
+import asyncio
+import json
+import logging
+import os
 import time
-from typing import List, Dict
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+from sortedcontainers import SortedKeyList
+from config import settings
 
 
-# Global cache for indexed claims
-claims_cache: List[Dict] = []
+log = logging.getLogger("thinkbaby.indexer")
+
+# Global cache for indexed claims: hash index + score-ordered view (descending)
+_by_hash: Dict[str, Dict] = {}
+_by_score = SortedKeyList(key=lambda c: -c['score'])
 last_indexed_block = 0
 cache_timestamp = 0
+# Bumped on every change to the index, so readers can key derived caches on it
+index_version = 0
 CACHE_TTL = 30  # seconds
+REINDEX_INTERVAL = 300  # seconds between background drift-correction rebuilds
+
+# Blocks scanned per checkpoint: progress is persisted after each segment so a
+# failed window only costs the current segment, not the whole backfill
+SCAN_SEGMENT_BLOCKS = 64_000
+
+# Sepolia's fixed slot time, used to estimate when a block was produced
+BLOCK_TIME_S = 12
+
+# Multicall batching: sub-calls per aggregate3 and concurrent batches in flight
+MULTICALL_BATCH_SIZE = 500
+MAX_IN_FLIGHT = 16
+
+# Single-flight refresh: one rebuild at a time, concurrent callers share it
+_refresh_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+
+# All ClaimRegistered events seen so far, keyed by claimHash
+known_events: Dict[str, Dict] = {}
+
+# Persisted scan position so restarts only scan new blocks
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".indexer_state.json")
+
+# (last_indexed_block, event count) as of the last write, to skip no-op saves
+_saved_state = (0, 0)
+
+
+def load_state():
+    """
+    Restore last_indexed_block and known events from STATE_FILE.
+    """
+    global last_indexed_block, known_events, _saved_state
+    
+    if not os.path.exists(STATE_FILE):
+        return
+    
+    try:
+        with open(STATE_FILE, "r") as f:
+            state = json.load(f)
+        last_indexed_block = state["last_indexed_block"]
+        known_events = {event['claimHash']: event for event in state["events"]}
+        for claim_hash in known_events:
+            contract_wrapper.mark_claim_exists(claim_hash)
+        _saved_state = (last_indexed_block, len(known_events))
+    except Exception as e:
+        log.warning("Ignoring unreadable indexer state: %s", e)
+        last_indexed_block = 0
+        known_events = {}
+
+
+def _write_state(state: Dict):
+    """
+    Write state to a temp file and swap it in, so a crash mid-write
+    never leaves a truncated STATE_FILE behind.
+    """
+    tmp_file = STATE_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_file, STATE_FILE)
+
+
+async def save_state():
+    """
+    Persist last_indexed_block and known events to STATE_FILE off the event loop.
+    Skipped when no event was added and the scan moved less than one segment
+    since the last write; a restart just rescans those few blocks.
+    """
+    global _saved_state
+    
+    saved_block, saved_count = _saved_state
+    if len(known_events) == saved_count and last_indexed_block - saved_block < SCAN_SEGMENT_BLOCKS:
+        return
+    
+    state = {
+        "last_indexed_block": last_indexed_block,
+        "events": list(known_events.values())
+    }
+    try:
+        await asyncio.to_thread(_write_state, state)
+        _saved_state = (state["last_indexed_block"], len(state["events"]))
+    except Exception as e:
+        log.warning("Failed to save indexer state: %s", e)
 
 
 def compute_reddit_score(
@@ -29,129 +124,321 @@ def compute_reddit_score(
     return validator_score + user_score
 
 
-def index_claims_from_events(force_refresh=False):
+def compute_reddit_scores(claims: List[Dict]) -> np.ndarray:
+    """
+    Vectorized compute_reddit_score over indexed claim dicts.
+    Returns an int64 array of scores in claim order.
+    """
+    n = len(claims)
+    user_true = np.fromiter((c['userTrueVotes'] for c in claims), dtype=np.int64, count=n)
+    user_false = np.fromiter((c['userFalseVotes'] for c in claims), dtype=np.int64, count=n)
+    validator_true = np.fromiter((c['validatorTrueVotes'] for c in claims), dtype=np.int64, count=n)
+    validator_false = np.fromiter((c['validatorFalseVotes'] for c in claims), dtype=np.int64, count=n)
+    return (validator_true - validator_false) * 3 + (user_true - user_false)
+
+
+async def fetch_vote_results(events: List[Dict], block_number: int) -> List:
+    """
+    Fetch getVotes + getValidatorVotes for every event via Multicall3.
+    Calls are split into MULTICALL_BATCH_SIZE batches run concurrently
+    (at most MAX_IN_FLIGHT at once). Returns (success, data) pairs in call order.
+    """
+    calls = []
+    for event in events:
+        claim_hash = event['claimHash']
+        calls.append((contract_wrapper.contract.address, contract_wrapper.encode_get_votes(claim_hash)))
+        calls.append((contract_wrapper.contract.address, contract_wrapper.encode_get_validator_votes(claim_hash)))
+    
+    sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+    
+    async def one(batch):
+        async with sem:
+            return await multicall.aggregate3(batch, block_identifier=block_number)
+    
+    batches = [calls[i:i + MULTICALL_BATCH_SIZE] for i in range(0, len(calls), MULTICALL_BATCH_SIZE)]
+    batch_results = await asyncio.gather(*(one(batch) for batch in batches))
+    
+    return [result for batch in batch_results for result in batch]
+
+
+async def index_claims_from_events(force_refresh=False):
     """
     Index all claims from blockchain events.
+    Only blocks after last_indexed_block are scanned for new events;
+    vote counts are re-read for every known claim.
     Builds cache with vote counts and scores.
+    
+    Stale-while-revalidate: when the cache has expired but is non-empty,
+    the stale claims are returned immediately and a single background
+    refresh is started. force_refresh always waits for a fresh rebuild.
     """
-    global claims_cache, last_indexed_block, cache_timestamp
+    if force_refresh:
+        return await _rebuild_index()
     
+    await _ensure_fresh()
+    return list(_by_score)
+
+
+async def _ensure_fresh():
+    """
+    Return once the cache is servable: immediately if it is fresh or stale
+    (starting a background refresh for the latter), otherwise after the
+    shared first build completes.
+    """
     # Check cache freshness
-    current_time = time.time()
-    if not force_refresh and claims_cache and (current_time - cache_timestamp) < CACHE_TTL:
-        return claims_cache
+    if cache_timestamp and (time.time() - cache_timestamp) < CACHE_TTL:
+        return
+    
+    task = start_background_refresh()
+    
+    # Serve stale data while the refresh runs
+    if cache_timestamp:
+        return
+    
+    # Nothing to serve yet - wait for the shared refresh
+    await asyncio.shield(task)
+
+
+def start_background_refresh() -> asyncio.Task:
+    """
+    Start a background rebuild unless one is already running.
+    Returns the shared refresh task.
+    """
+    global _refresh_task
+    
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_rebuild_index())
+    
+    return _refresh_task
+
+
+async def run_periodic_refresh(interval: float = REINDEX_INTERVAL):
+    """
+    Rebuild the index every interval seconds so claims added via add_claim
+    and votes on unvisited claims converge with the chain without traffic.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await start_background_refresh()
+
+
+def is_warm() -> bool:
+    """True once the first index build has completed."""
+    return bool(cache_timestamp)
+
+
+async def _rebuild_index():
+    """
+    Rebuild the claim cache while holding the refresh lock.
+    """
+    async with _refresh_lock:
+        return await _index_claims()
+
+
+async def _index_claims():
+    """
+    Scan new events, re-read votes and swap in the rebuilt cache.
+    """
+    global _by_hash, _by_score, last_indexed_block, cache_timestamp, index_version
     
-    print(f"\n🔍 Indexing claims from blockchain events...")
+    current_time = time.time()
     start_time = time.time()
     
     try:
-        # Query all ClaimRegistered events
-        events = contract_wrapper.get_claim_registered_events(
-            from_block=0,
-            to_block='latest'
-        )
+        # Pin log scan and vote reads to a single block
+        block_number = await contract_wrapper.aw3.eth.block_number
         
-        print(f"   Found {len(events)} ClaimRegistered events")
+        # Query only ClaimRegistered events we haven't seen yet, checkpointing
+        # after each segment so a failure resumes instead of restarting
+        from_block = last_indexed_block + 1 if last_indexed_block else settings.indexer_start_block
+        for segment_start in range(from_block, block_number + 1, SCAN_SEGMENT_BLOCKS):
+            segment_end = min(segment_start + SCAN_SEGMENT_BLOCKS - 1, block_number)
+            new_events = await contract_wrapper.get_claim_registered_events(
+                from_block=segment_start,
+                to_block=segment_end
+            )
+            for event in new_events:
+                known_events[event['claimHash']] = event
+                contract_wrapper.mark_claim_exists(event['claimHash'])
+            
+            last_indexed_block = segment_end
+            await save_state()
+            log.debug("Found %d new ClaimRegistered events (blocks %d-%d)", len(new_events), segment_start, segment_end)
+        
+        events = list(known_events.values())
+        
+        # Batch getVotes + getValidatorVotes for every claim through Multicall3
+        results = await fetch_vote_results(events, block_number)
         
         indexed_claims = []
         
-        for event in events:
+        for i, event in enumerate(events):
             claim_hash = event['claimHash']
-            submitter = event['submitter']
-            block_number = event['blockNumber']
             
             try:
-                # Get vote counts from contract
-                user_votes = contract_wrapper.get_votes(claim_hash)
-                validator_votes = contract_wrapper.get_validator_votes(claim_hash)
-                
-                # Compute Reddit score
-                score = compute_reddit_score(
-                    user_votes['true_votes'],
-                    user_votes['false_votes'],
-                    validator_votes['true_votes'],
-                    validator_votes['false_votes']
-                )
+                # Failed sub-calls (e.g. reverts) decode as zero votes
+                user_votes = contract_wrapper.decode_vote_counts(*results[2 * i])
+                validator_votes = contract_wrapper.decode_vote_counts(*results[2 * i + 1])
                 
                 indexed_claims.append({
                     'claimHash': claim_hash,
-                    'submitter': submitter,
-                    'blockNumber': block_number,
+                    'submitter': event['submitter'],
+                    'blockNumber': event['blockNumber'],
                     'userTrueVotes': user_votes['true_votes'],
                     'userFalseVotes': user_votes['false_votes'],
                     'validatorTrueVotes': validator_votes['true_votes'],
                     'validatorFalseVotes': validator_votes['false_votes'],
-                    'score': score,
                     'transactionHash': event['transactionHash']
                 })
                 
             except Exception as e:
-                print(f"   ⚠️  Failed to index claim {claim_hash[:16]}...: {str(e)}")
+                log.warning("Failed to index claim %s: %s", claim_hash[:16], e)
                 continue
         
-        # Sort by Reddit score (descending)
-        indexed_claims.sort(key=lambda x: x['score'], reverse=True)
+        # Compute all Reddit scores in one vectorized pass
+        scores = compute_reddit_scores(indexed_claims)
+        for claim, score in zip(indexed_claims, scores.tolist()):
+            claim['score'] = score
+        
+        # Pre-order by score so building the sorted index is a linear pass
+        order = np.argsort(-scores, kind='stable')
+        indexed_claims = [indexed_claims[i] for i in order]
         
-        # Update cache
-        claims_cache = indexed_claims
-        last_indexed_block = contract_wrapper.w3.eth.block_number
+        # Update cache (sorted by Reddit score, descending)
+        _by_hash = {claim['claimHash']: claim for claim in indexed_claims}
+        _by_score = SortedKeyList(indexed_claims, key=lambda c: -c['score'])
+        index_version += 1
+        last_indexed_block = block_number
         cache_timestamp = current_time
+        await save_state()
         
         elapsed = time.time() - start_time
-        print(f"   ✅ Indexed {len(indexed_claims)} claims in {elapsed:.2f}s")
-        print(f"   📊 Top score: {indexed_claims[0]['score'] if indexed_claims else 0}")
+        log.info(
+            "Indexed %d claims up to block %d in %.2fs (top score %d)",
+            len(indexed_claims), block_number, elapsed, _by_score[0]['score'] if _by_score else 0
+        )
         
-        return indexed_claims
+        return list(_by_score)
         
     except Exception as e:
-        print(f"   ❌ Event indexing failed: {str(e)}")
+        log.error("Event indexing failed: %s", e)
         return []
 
 
-def get_cached_claims() -> List[Dict]:
+async def get_cached_claims() -> List[Dict]:
     """
     Get cached claims, refresh if stale.
     """
-    return index_claims_from_events(force_refresh=False)
+    return await index_claims_from_events(force_refresh=False)
+
+
+def estimate_block_time(block_number: int) -> int:
+    """
+    Unix time of block_number, extrapolated from the last index run
+    (cache_timestamp at last_indexed_block). Stable until the next run.
+    """
+    if not cache_timestamp:
+        return int(time.time())
+    return int(cache_timestamp - max(last_indexed_block - block_number, 0) * BLOCK_TIME_S)
 
 
-def refresh_claim_cache(claim_hash: str):
+async def get_feed_page(offset: int, limit: Optional[int]) -> Tuple[List[Dict], int]:
+    """
+    Slice one page of claims (by score, descending) without copying the
+    whole index; limit=None runs to the end. Returns (claims, total).
+    """
+    await _ensure_fresh()
+    end = None if limit is None else offset + limit
+    return _by_score[offset:end], len(_by_score)
+
+
+def get_cached_claim(claim_hash: str) -> Optional[Dict]:
+    """
+    O(1) lookup of a single indexed claim by hash (None if not indexed).
+    """
+    return _by_hash.get(claim_hash)
+
+
+def add_claim(claim_hash: str, submitter: str, block_number: int, transaction_hash: str = ""):
+    """
+    Insert a just-registered claim (zero votes) without a full rebuild.
+    The next incremental scan replaces its event with the on-chain one.
+    """
+    global index_version
+    
+    if claim_hash in _by_hash:
+        return
+    
+    event = {
+        'claimHash': claim_hash,
+        'submitter': submitter,
+        'blockNumber': block_number,
+        'transactionHash': transaction_hash
+    }
+    known_events.setdefault(claim_hash, event)
+    
+    claim = {
+        **event,
+        'userTrueVotes': 0,
+        'userFalseVotes': 0,
+        'validatorTrueVotes': 0,
+        'validatorFalseVotes': 0,
+        'score': compute_reddit_score(0, 0, 0, 0)
+    }
+    _by_hash[claim_hash] = claim
+    _by_score.add(claim)
+    index_version += 1
+
+
+async def refresh_claim_cache(claim_hash: str):
     """
     Refresh cache for a specific claim after vote.
     """
-    global claims_cache
+    global index_version
     
-    for claim in claims_cache:
-        if claim['claimHash'] == claim_hash:
-            try:
-                # Refresh vote counts
-                user_votes = contract_wrapper.get_votes(claim_hash)
-                validator_votes = contract_wrapper.get_validator_votes(claim_hash)
-                
-                # Update claim
-                claim['userTrueVotes'] = user_votes['true_votes']
-                claim['userFalseVotes'] = user_votes['false_votes']
-                claim['validatorTrueVotes'] = validator_votes['true_votes']
-                claim['validatorFalseVotes'] = validator_votes['false_votes']
-                
-                # Recalculate score
-                claim['score'] = compute_reddit_score(
-                    user_votes['true_votes'],
-                    user_votes['false_votes'],
-                    validator_votes['true_votes'],
-                    validator_votes['false_votes']
-                )
-                
-                # Re-sort cache
-                claims_cache.sort(key=lambda x: x['score'], reverse=True)
-                
-                print(f"   ✅ Refreshed cache for claim {claim_hash[:16]}...")
-                return True
-                
-            except Exception as e:
-                print(f"   ⚠️  Failed to refresh claim cache: {str(e)}")
-                return False
+    if claim_hash not in _by_hash:
+        # Claim not in cache, force full refresh
+        await index_claims_from_events(force_refresh=True)
+        return True
+    
+    try:
+        # Refresh vote counts
+        block_number = await contract_wrapper.aw3.eth.block_number
+        user_votes, validator_votes = await asyncio.gather(
+            contract_wrapper.async_get_votes(claim_hash, block_number),
+            contract_wrapper.async_get_validator_votes(claim_hash, block_number)
+        )
+    except Exception as e:
+        log.warning("Failed to refresh claim cache: %s", e)
+        return False
     
-    # Claim not in cache, force full refresh
-    index_claims_from_events(force_refresh=True)
+    # Look up again: a full rebuild may have swapped the cache while we awaited
+    claim = _by_hash.get(claim_hash)
+    if claim is None:
+        return True
+    
+    # Reposition in score order: remove before the key changes
+    _by_score.remove(claim)
+    
+    # Update claim
+    claim['userTrueVotes'] = user_votes['true_votes']
+    claim['userFalseVotes'] = user_votes['false_votes']
+    claim['validatorTrueVotes'] = validator_votes['true_votes']
+    claim['validatorFalseVotes'] = validator_votes['false_votes']
+    
+    # Recalculate score
+    claim['score'] = compute_reddit_score(
+        user_votes['true_votes'],
+        user_votes['false_votes'],
+        validator_votes['true_votes'],
+        validator_votes['false_votes']
+    )
+    
+    _by_score.add(claim)
+    index_version += 1
+    
+    log.debug("Refreshed cache for claim %s", claim_hash[:16])
     return True
+
+
+load_state()
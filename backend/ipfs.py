@@ -1,12 +1,54 @@
+import hashlib
 import httpx
+import orjson
+from cachetools import LRUCache
 from config import settings
+from breakers import pinata_breaker, transient_retry
 
 
-async def upload_to_pinata(data: dict) -> str:
+# Shared client: keeps TCP/TLS connections to Pinata alive across calls
+_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(
+        connect=settings.pinata_connect_timeout_s,
+        read=settings.pinata_timeout_s,
+        write=settings.pinata_timeout_s,
+        pool=1.0
+    ),
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+)
+
+# CID -> parsed JSON. CIDs are content addresses, so entries never go stale
+_content_cache = LRUCache(maxsize=2048)
+
+# blake2b(payload) -> CID for content this process already pinned
+_pinned_cids = LRUCache(maxsize=4096)
+
+
+async def close_client() -> None:
+    """Close the shared Pinata HTTP client."""
+    await _client.aclose()
+
+
+async def _request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Issue a request and raise on HTTP errors so the breaker counts them."""
+    response = await _client.request(method, url, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+@transient_retry
+async def _get_with_retry(url: str) -> httpx.Response:
+    """GET with backoff on transient errors (safe: gateway reads are idempotent)."""
+    return await _request("GET", url)
+
+
+async def upload_to_pinata(data) -> str:
     """
     Upload JSON data to Pinata (IPFS).
+    data may be a dict or already-serialized JSON bytes.
     Returns CID (IPFS hash).
-    Raises exception if upload fails.
+    Raises exception if upload fails or the Pinata breaker is open.
     """
     url = "https://api.pinata.cloud/pinning/pinJSONToIPFS"
     
@@ -16,28 +58,45 @@ async def upload_to_pinata(data: dict) -> str:
         "Content-Type": "application/json"
     }
     
-    async with httpx.AsyncClient(timeout=20.0) as client:
-        response = await client.post(
-            url,
-            json=data,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        result = response.json()
-        return result["IpfsHash"]
+    payload = data if isinstance(data, bytes) else orjson.dumps(data)
+    
+    # Identical bytes always pin to the same CID; skip the round trip
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    cid = _pinned_cids.get(digest)
+    if cid is not None:
+        return cid
+    
+    response = await pinata_breaker.call(
+        _request,
+        "POST",
+        url,
+        content=payload,
+        headers=headers
+    )
+    
+    result = orjson.loads(response.content)
+    cid = result["IpfsHash"]
+    
+    # We already hold the content for this CID; later fetches skip the gateway
+    _content_cache[cid] = orjson.loads(payload)
+    _pinned_cids[digest] = cid
+    return cid
 
 
 async def fetch_from_pinata(cid: str) -> dict:
     """
     Fetch JSON data from IPFS via Pinata gateway.
-    Returns parsed JSON object.
-    Raises exception if fetch fails.
+    Returns parsed JSON object (cached by CID).
+    Raises exception if fetch fails or the Pinata breaker is open.
     """
+    cached = _content_cache.get(cid)
+    if cached is not None:
+        return cached
+    
     url = f"https://gateway.pinata.cloud/ipfs/{cid}"
     
-    async with httpx.AsyncClient(timeout=20.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        
-        return response.json()
+    response = await pinata_breaker.call(_get_with_retry, url)
+    
+    content = orjson.loads(response.content)
+    _content_cache[cid] = content
+    return content
@@ -1,21 +1,47 @@
+import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
 from routes import router
 import contract_wrapper
 import event_indexer
+import ai_connector
+import ipfs
+from claim_store import claim_store
+
+
+# Logging: app loggers enqueue records; a background thread does the stream I/O
+log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = QueueListener(log_queue, _stream_handler)
+
+app_logger = logging.getLogger("thinkbaby")
+app_logger.setLevel(settings.log_level.upper())
+app_logger.addHandler(QueueHandler(log_queue))
+app_logger.propagate = False
+log_listener.start()
+
+log = logging.getLogger("thinkbaby.main")
 
 
 app = FastAPI(
     title="Fake News Verification Backend",
     description="Decentralized fake news verification protocol backend",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# CORS
+# CORS: parse the origin list once; a wildcard lets Starlette skip the lookup
+_CORS_ORIGINS = tuple(origin for origin in settings.cors_origins_list if origin)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins_list,
+    allow_origins=["*"] if "*" in _CORS_ORIGINS else _CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -30,75 +56,72 @@ async def startup():
     """
     Startup checks and verification.
     """
-    print("\n" + "="*60)
-    print("🚀 FAKE NEWS VERIFICATION BACKEND - SEPOLIA MODE")
-    print("="*60)
+    log.info("Fake news verification backend starting (Sepolia mode)")
+    log.info("RPC URL: %s...", settings.sepolia_rpc_url[:50])
+    log.info("Contract: %s", settings.contract_address)
+    if not settings.indexer_start_block:
+        log.warning("INDEXER_START_BLOCK is not set; the first event scan starts at genesis. Set it to the contract deployment block")
     
-    # Print configuration
-    print(f"\n📋 Configuration:")
-    print(f"   RPC URL: {settings.sepolia_rpc_url[:50]}...")
-    print(f"   BACKEND CONTRACT: {settings.contract_address}")
+    wallet_address = contract_wrapper.account.address
+    
+    await claim_store.open()
     
     # Check Web3 connection
     try:
-        is_connected = contract_wrapper.w3.is_connected()
-        if not is_connected:
-            print("\n❌ ERROR: Cannot connect to Sepolia RPC")
-            print("   Check SEPOLIA_RPC_URL in .env file")
-            raise Exception("Failed to connect to Sepolia RPC")
+        # Chain ID, balance, contract probe and role in one batched JSON-RPC request
+        # (sent one by one if the provider rejects batches)
+        try:
+            chain_id_result, balance_result, probe_result, role_result = contract_wrapper.rpc_batch_or_each([
+                ("eth_chainId", []),
+                ("eth_getBalance", [wallet_address, "latest"]),
+                contract_wrapper.contract_call_request("claimExists", [bytes(32)]),
+                contract_wrapper.contract_call_request("getRole", [wallet_address])
+            ])
+        except Exception as e:
+            log.error("Cannot connect to Sepolia RPC - check SEPOLIA_RPC_URL in .env")
+            raise Exception(f"Failed to connect to Sepolia RPC: {str(e)}")
         
-        print(f"\n✅ Connected to Sepolia RPC")
+        if isinstance(chain_id_result, Exception):
+            raise chain_id_result
         
         # Get and verify chain ID
-        chain_id = contract_wrapper.w3.eth.chain_id
-        print(f"⛓️  Chain ID: {chain_id}")
+        chain_id = int(chain_id_result, 16)
+        log.info("Connected to Sepolia RPC (chain ID %d)", chain_id)
         
         if chain_id != 11155111:
-            print(f"\n❌ ERROR: Wrong network!")
-            print(f"   Expected: Sepolia (11155111)")
-            print(f"   Got: {chain_id}")
+            log.error("Wrong network: expected Sepolia (11155111), got %d", chain_id)
             raise Exception(f"Wrong network: {chain_id}")
         
-        # Print wallet info
-        wallet_address = contract_wrapper.account.address
-        print(f"\n👛 Backend Wallet:")
-        print(f"   Address: {wallet_address}")
-        
         # Check wallet balance
-        balance = contract_wrapper.w3.eth.get_balance(wallet_address)
+        if isinstance(balance_result, Exception):
+            raise balance_result
+        balance = int(balance_result, 16)
         balance_eth = contract_wrapper.w3.from_wei(balance, 'ether')
-        print(f"   Balance: {balance_eth} ETH")
+        log.info("Backend wallet %s balance: %s ETH", wallet_address, balance_eth)
         
         if balance_eth < 0.1:
-            print(f"\n⚠️  WARNING: Low wallet balance!")
-            print(f"   Current: {balance_eth} ETH")
-            print(f"   Recommended: 0.5+ ETH")
-            print(f"   Get Sepolia ETH from: https://sepoliafaucet.com/")
-        
-        # Verify contract address loaded from env
-        print(f"\n📝 Smart Contract:")
-        print(f"   Address: {settings.contract_address}")
-        print(f"   Loaded from: .env file")
+            log.warning(
+                "Low wallet balance (%s ETH, 0.5+ recommended). Get Sepolia ETH from https://sepoliafaucet.com/",
+                balance_eth
+            )
         
         # Test contract connectivity
-        try:
-            test_hash = "0x" + "0" * 64
-            test_bytes = bytes.fromhex(test_hash[2:])
-            contract_wrapper.contract.functions.claimExists(test_bytes).call()
-            print(f"   Status: ✅ Contract accessible")
-        except Exception as e:
-            print(f"   Status: ⚠️  Contract call failed: {str(e)[:50]}")
+        if isinstance(probe_result, Exception):
+            log.warning("Contract call failed: %s", str(probe_result)[:50])
+        else:
+            log.info("Contract accessible")
         
         # Check and register backend wallet role
-        print(f"\n🔐 Backend Wallet Role Check:")
-        print(f"   Wallet: {wallet_address}")
-        
         try:
-            backend_role = contract_wrapper.contract.functions.getRole(wallet_address).call()
-            print(f"   Current Role: {backend_role} (0=None, 1=User, 2=Validator)")
+            if isinstance(role_result, Exception):
+                raise role_result
+            backend_role = contract_wrapper.w3.codec.decode(
+                ["uint8"], bytes.fromhex(role_result[2:])
+            )[0]
+            log.info("Backend wallet role: %d (0=None, 1=User, 2=Validator)", backend_role)
             
             if backend_role == 0:
-                print(f"\n⚠️  Backend wallet not registered. Auto-registering as User...")
+                log.warning("Backend wallet not registered. Auto-registering as User...")
                 
                 # Build transaction
                 tx = contract_wrapper.contract.functions.registerAsUser().build_transaction({
@@ -113,49 +136,77 @@ async def startup():
                 
                 # Send transaction
                 tx_hash = contract_wrapper.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-                print(f"   Transaction sent: {tx_hash.hex()}")
+                log.info("registerAsUser transaction sent: %s", tx_hash.hex())
                 
                 # Wait for confirmation
                 receipt = contract_wrapper.w3.eth.wait_for_transaction_receipt(tx_hash)
                 
                 if receipt['status'] == 1:
-                    print(f"   ✅ Backend wallet registered as User")
-                    print(f"   Block: {receipt['blockNumber']}")
-                    print(f"   Gas used: {receipt['gasUsed']}")
+                    contract_wrapper.invalidate_role(wallet_address)
+                    log.info(
+                        "Backend wallet registered as User in block %d (gas %d)",
+                        receipt['blockNumber'], receipt['gasUsed']
+                    )
                 else:
-                    print(f"   ❌ Registration transaction failed")
+                    log.error("Registration transaction failed")
                     raise Exception("Backend wallet registration failed")
-            else:
-                print(f"   ✅ Backend wallet already registered")
             
-            print(f"   ✅ Backend wallet ready for claim registration")
+            log.info("Backend wallet ready for claim registration")
             
         except Exception as e:
-            print(f"   ❌ Role check/registration failed: {str(e)}")
-            print(f"\n⚠️  WARNING: Backend wallet may not be able to register claims")
-            print(f"   Manual registration may be required")
+            log.error("Role check/registration failed: %s", e)
+            log.warning("Backend wallet may not be able to register claims; manual registration may be required")
         
-        print("\n" + "="*60)
-        print("✅ BACKEND READY FOR SEPOLIA TRANSACTIONS")
-        print("="*60 + "\n")
+        log.info("Backend ready for Sepolia transactions")
         
-        # Index claims from blockchain events
-        print("🔄 Indexing claims from blockchain...")
-        event_indexer.index_claims_from_events(force_refresh=True)
-        print("✅ Event indexing complete\n")
+        # Index claims in the background so the server can bind immediately;
+        # /health reports "warming" and /feed waits on this task until it's done
+        event_indexer.start_background_refresh()
+        app.state.reindex_task = asyncio.create_task(event_indexer.run_periodic_refresh())
         
     except Exception as e:
-        print(f"\n❌ STARTUP FAILED: {str(e)}")
-        print("\nPlease check:")
-        print("  1. .env file exists and is configured")
-        print("  2. SEPOLIA_RPC_URL is valid")
-        print("  3. BACKEND_PRIVATE_KEY is valid")
-        print("  4. CONTRACT_ADDRESS is correct")
-        print("  5. Wallet has Sepolia ETH")
-        print("\n" + "="*60 + "\n")
+        log.error(
+            "Startup failed: %s. Please check: .env exists and is configured; SEPOLIA_RPC_URL, "
+            "BACKEND_PRIVATE_KEY and CONTRACT_ADDRESS are valid; wallet has Sepolia ETH",
+            e
+        )
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Close shared HTTP clients and the claim store, then flush queued logs.
+    """
+    reindex_task = getattr(app.state, "reindex_task", None)
+    if reindex_task:
+        reindex_task.cancel()
+    
+    await ai_connector.close_client()
+    await ipfs.close_client()
+    await claim_store.close()
+    log_listener.stop()
+
+
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # The claim registry is shared via SQLite, but the indexer cache lives
+    # in process memory, so keep a single worker unless WEB_CONCURRENCY is set
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    # uvloop is unavailable on Windows; fall back to the stock asyncio loop there
+    uvicorn.run(
+        # Workers need an import string; with one, pass the app itself so this
+        # module isn't imported a second time as "main" (doubling log handlers)
+        app if workers == 1 else "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
@@ -0,0 +1,109 @@
+"""
+Multicall3 helper for batching read-only contract calls.
+Collapses many eth_call round-trips into a single aggregate3 call.
+"""
+from cachetools import TTLCache
+from web3 import Web3
+import contract_wrapper
+from contract_wrapper import aw3
+
+
+# Multicall3 is deployed at the same address on every major chain (incl. Sepolia)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "getBlockNumber",
+        "outputs": [{"internalType": "uint256", "name": "blockNumber", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+multicall_contract = aw3.eth.contract(
+    address=Web3.to_checksum_address(MULTICALL3_ADDRESS),
+    abi=MULTICALL3_ABI
+)
+
+# claim_hash -> (user_votes, validator_votes). Short TTL: a page load reads the
+# same claim from several endpoints, but votes should still feel live
+VOTES_CACHE_TTL = 3
+_votes_cache = TTLCache(maxsize=4096, ttl=VOTES_CACHE_TTL)
+
+
+async def aggregate3(calls, block_identifier='latest', allow_failure=True):
+    """
+    Execute a list of (target, calldata) calls in a single eth_call.
+    Returns list of (success, return_data) tuples in call order.
+    Individual reverts are reported as success=False when allow_failure is set.
+    """
+    if not calls:
+        return []
+
+    payload = [(target, allow_failure, calldata) for target, calldata in calls]
+    results = await multicall_contract.functions.aggregate3(payload).call(
+        block_identifier=block_identifier
+    )
+
+    return [(success, return_data) for success, return_data in results]
+
+
+async def get_all_votes(claim_hash: str):
+    """
+    Read user and validator vote counts in a single eth_call.
+    Bundles getVotes, getValidatorVotes and Multicall3.getBlockNumber so all
+    three values come from the same block.
+    Returns (user_votes, validator_votes), each shaped like contract_wrapper.async_get_votes().
+    Results are reused for VOTES_CACHE_TTL seconds.
+    """
+    cached = _votes_cache.get(claim_hash)
+    if cached is not None:
+        return cached
+
+    block_call = Web3.to_bytes(hexstr=multicall_contract.encodeABI(fn_name="getBlockNumber"))
+    target = contract_wrapper.contract.address
+
+    block_result, user_result, validator_result = await aggregate3([
+        (multicall_contract.address, block_call),
+        (target, contract_wrapper.encode_get_votes(claim_hash)),
+        (target, contract_wrapper.encode_get_validator_votes(claim_hash))
+    ])
+
+    block_number = aw3.codec.decode(["uint256"], block_result[1])[0]
+
+    user_votes = contract_wrapper.decode_vote_counts(*user_result)
+    validator_votes = contract_wrapper.decode_vote_counts(*validator_result)
+    user_votes["block_number"] = block_number
+    validator_votes["block_number"] = block_number
+
+    _votes_cache[claim_hash] = (user_votes, validator_votes)
+    return user_votes, validator_votes
@@ -1,71 +1,173 @@
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, validator
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Annotated, Optional, Dict, Any
 import contract_wrapper
 import ai_connector
 import ipfs
 from utils import hash_claim
-from service_layer import generate_snapshot_hash
+from service_layer import generate_snapshot_hash_and_bytes
 import event_indexer
+import multicall
+from claim_store import ClaimRow, claim_store
+from breakers import ai_breaker, pinata_breaker
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache, TTLCache
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import orjson
 import time
-import sys
-import os
-
-# Add parent directory to path to import credibility_engine
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from credibility_engine import CredibilityEngine
+import weakref
 
 
 router = APIRouter()
 
+log = logging.getLogger("thinkbaby.routes")
+
+
+# Persistent storage for IPFS CIDs: maps claimHash -> CID and metadata
+claim_registry = claim_store
+
+# Share the Credibility Engine instance created by ai_connector
+credibility_engine = ai_connector.credibility_engine
+
+# Worker threads for blocking web3 calls, so they don't stall the event loop
+_THREADPOOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="web3")
+
+
+# Per-claim registration locks; entries disappear once no request holds them
+_registration_locks = weakref.WeakValueDictionary()
 
-# In-memory storage for IPFS CIDs (backward compatibility)
-# Maps claimHash -> CID and metadata
-claim_registry = {}
+# (claimHash, vote counts) -> (block, ai_output, snapshot_hash, snapshot_cid).
+# While votes are unchanged the pinned snapshot still describes the claim.
+# snapshot_cid is None until the background pin completes.
+_snapshot_cache = TTLCache(maxsize=10_000, ttl=300)
 
-# Initialize Credibility Engine
-credibility_engine = CredibilityEngine()
+# (offset, limit, index_version, registry_version) -> serialized /feed page.
+# Any index or registry change moves the versions, so old entries just age out
+_feed_page_cache = LRUCache(maxsize=256)
+
+# Seconds to wait before each retry of a background content upload
+UPLOAD_RETRY_DELAYS = (2, 10, 30)
+
+
+def _run_sync(func, *args):
+    """Run a blocking contract_wrapper call on the web3 thread pool."""
+    return asyncio.get_running_loop().run_in_executor(_THREADPOOL, func, *args)
+
+
+def _cached_json(request: Request, content: dict, max_age: int, private: bool = False) -> Response:
+    """
+    Serialize content with a weak ETag and short-lived Cache-Control.
+    Answers 304 Not Modified when the client's If-None-Match matches.
+    The ETag hashes the finished body, so a 304 saves bandwidth, not the
+    work of building it. Pass private=True for caller-specific responses.
+    """
+    return _cached_body(request, orjson.dumps(content), max_age, private)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison of etag against a comma-separated If-None-Match list."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def _cached_body(request: Request, body: bytes, max_age: int, private: bool = False) -> Response:
+    """_cached_json for an already-serialized JSON body."""
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"{'private' if private else 'public'}, max-age={max_age}, stale-while-revalidate=30"
+    }
+    
+    if _etag_matches(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _caller_metadata(claim_hash: str, caller_address: Optional[str]):
+    """Fetch (role, has_voted) for a caller in one RPC batch; (None, False) without one."""
+    if not caller_address:
+        return None, False
+    
+    return await _run_sync(contract_wrapper.get_caller_metadata, claim_hash, caller_address)
+
+
+async def _caller_metadata_or_default(claim_hash: str, caller_address: Optional[str]):
+    """Like _caller_metadata, but a failed lookup reports role 0 instead of raising."""
+    try:
+        return await _caller_metadata(claim_hash, caller_address)
+    except Exception as e:
+        log.warning("Failed to get caller role for %s: %s", caller_address, e)
+        return 0, False
+
+
+async def _fetch_news_content(content_cid: Optional[str]) -> str:
+    """Claim text from IPFS, or a placeholder if missing or unreachable."""
+    if not content_cid:
+        return "[Content not available]"
+    
+    try:
+        claim_content = await ipfs.fetch_from_pinata(content_cid)
+        return claim_content.get("newsContent", "[Content not available]")
+    except Exception as e:
+        log.warning("Failed to fetch content %s from IPFS: %s", content_cid, e)
+        return "[Content not available - IPFS fetch failed]"
+
+
+# 0x-prefixed 32-byte hex hash, validated by pydantic-core before the handler runs
+ClaimHash = Annotated[str, Path(pattern=r"^0x[0-9a-fA-F]{64}$")]
 
 
 class ClaimRequest(BaseModel):
+    # Upper bound enforced by pydantic-core before the validator runs
+    model_config = ConfigDict(str_max_length=10000)
+    
     text: str
     
-    @validator('text')
-    def validate_text(cls, v):
-        stripped = v.strip()
-        if len(stripped) < 10:
+    @field_validator('text')
+    @classmethod
+    def validate_text(cls, v: str) -> str:
+        if len(v.strip()) < 10:
             raise ValueError("Claim must be at least 10 characters")
-        if len(v) > 10000:
-            raise ValueError("Claim too long (max 10,000 characters)")
         return v
 
 
 class RegisterClaimRequest(BaseModel):
+    model_config = ConfigDict(str_max_length=10000)
+    
     claimHash: str
     newsContent: str
     submitterAddress: Optional[str] = None
     
-    @validator('newsContent')
-    def validate_content(cls, v):
-        stripped = v.strip()
-        if len(stripped) < 10:
+    @field_validator('newsContent')
+    @classmethod
+    def validate_content(cls, v: str) -> str:
+        if len(v.strip()) < 10:
             raise ValueError("Content must be at least 10 characters")
-        if len(v) > 10000:
-            raise ValueError("Content too long (max 10,000 characters)")
         return v
 
 
 class RegisterClaimFullRequest(BaseModel):
+    model_config = ConfigDict(str_max_length=10000)
+    
     newsContent: str
     submitterAddress: str
     
-    @validator('newsContent')
-    def validate_content(cls, v):
-        stripped = v.strip()
-        if len(stripped) < 10:
+    @field_validator('newsContent')
+    @classmethod
+    def validate_content(cls, v: str) -> str:
+        if len(v.strip()) < 10:
             raise ValueError("Content must be at least 10 characters")
-        if len(v) > 10000:
-            raise ValueError("Content too long (max 10,000 characters)")
         return v
 
 
@@ -75,182 +177,154 @@ class AnalyzeRequest(BaseModel):
 
 
 class CredibilityCheckRequest(BaseModel):
-    claim: str
+    claim: str = Field(max_length=10000)
     source_url: Optional[str] = None
     rag_context: Optional[str] = None
     web_context: Optional[str] = None
     votes_data: Optional[Dict[str, Any]] = None
     
-    @validator('claim')
-    def validate_claim(cls, v):
+    @field_validator('claim')
+    @classmethod
+    def validate_claim(cls, v: str) -> str:
         stripped = v.strip()
         if len(stripped) < 5:
             raise ValueError("Claim must be at least 5 characters")
-        if len(v) > 10000:
-            raise ValueError("Claim too long (max 10,000 characters)")
         return stripped
 
 
 @router.post("/claims/register")
-async def register_claim_full(raw_request: Request):
+async def register_claim_full(request: RegisterClaimFullRequest, background_tasks: BackgroundTasks):
     """
     Backend-orchestrated claim registration.
     This endpoint:
     1. Generates claim hash
     2. Registers on blockchain via backend wallet
-    3. Stores content in IPFS
-    4. Returns claim hash
+    3. Returns claim hash
+    4. Stores content in IPFS in the background (contentCID appears on
+       /claims/{hash}/detail once the upload completes)
     
     This ensures atomic consistency between blockchain and backend.
     """
-    from utils import hash_claim
-    
-    # TEMP: Log raw body for debugging
-    raw_body = await raw_request.json()
-    print(f"\n{'='*60}")
-    print(f"🔍 RAW BODY RECEIVED:")
-    print(f"{'='*60}")
-    print(f"Body: {raw_body}")
-    print(f"Keys: {list(raw_body.keys())}")
-    print(f"{'='*60}\n")
-    
-    # Validate against Pydantic model
-    try:
-        request = RegisterClaimFullRequest(**raw_body)
-    except Exception as e:
-        print(f"❌ Pydantic validation failed: {str(e)}")
-        raise HTTPException(
-            status_code=422,
-            detail=f"Invalid request body: {str(e)}"
-        )
-    
     # Step 1: Generate claim hash
     claim_hash = hash_claim(request.newsContent)
     
-    print(f"\n{'='*60}")
-    print(f"🔄 BACKEND-ORCHESTRATED REGISTRATION")
-    print(f"{'='*60}")
-    print(f"📝 Generated hash: {claim_hash}")
-    print(f"👤 Submitter: {request.submitterAddress}")
-    print(f"📄 Content length: {len(request.newsContent)} chars")
+    log.info(
+        "Registering claim %s for %s (%d chars)",
+        claim_hash, request.submitterAddress, len(request.newsContent)
+    )
     
-    # Step 2: Check if already exists
-    if contract_wrapper.claim_exists(claim_hash):
-        print(f"⚠️  Claim already exists on-chain")
-        
+    # One submission per hash at a time: a concurrent retry waits, then sees
+    # the claim as already registered instead of sending a duplicate tx
+    lock = _registration_locks.get(claim_hash)
+    if lock is None:
+        lock = asyncio.Lock()
+        _registration_locks[claim_hash] = lock
+    
+    async with lock:
+        return await _register_claim(claim_hash, request, background_tasks)
+
+
+async def _register_claim(claim_hash: str, request: RegisterClaimFullRequest, background_tasks: BackgroundTasks):
+    """
+    Steps 2-6 of register_claim_full, run under the claim's registration lock.
+    """
+    # Step 2: Check if already exists (live on a cached miss: a resubmit
+    # of a wallet-registered claim would otherwise revert on-chain)
+    if await contract_wrapper.async_claim_exists(claim_hash, trust_missing=False):
         # Check if in registry
-        if claim_hash in claim_registry:
-            existing = claim_registry[claim_hash]
-            print(f"✅ Found in registry")
-            print(f"   CID: {existing['contentCID']}")
-            print(f"   Block: {existing['blockNumber']}")
-            print(f"{'='*60}\n")
+        existing = await claim_registry.get(claim_hash)
+        if existing:
+            log.info("Claim %s already registered (block %s)", claim_hash, existing.block_number)
             return {
                 "claimHash": claim_hash,
-                "contentCID": existing["contentCID"],
-                "blockNumber": existing["blockNumber"],
-                "claimSubmitter": existing["claimSubmitter"],
+                "contentCID": existing.content_cid,
+                "blockNumber": existing.block_number,
+                "claimSubmitter": existing.submitter,
                 "alreadyExists": True
             }
         else:
-            print(f"❌ Exists on-chain but NOT in registry - DESYNC DETECTED")
-            print(f"{'='*60}\n")
+            log.warning("Claim %s exists on-chain but not in registry (desync)", claim_hash)
             raise HTTPException(
                 status_code=400,
                 detail="Claim exists on-chain but not in backend registry"
             )
     
     # Step 3: Register on blockchain (backend wallet signs)
-    print(f"📝 Registering on blockchain...")
     try:
-        hash_bytes = contract_wrapper.hash_to_bytes32(claim_hash)
-        
-        # Build transaction
-        tx = contract_wrapper.contract.functions.registerClaim(hash_bytes).build_transaction({
-            'from': contract_wrapper.account.address,
-            'nonce': contract_wrapper.w3.eth.get_transaction_count(contract_wrapper.account.address),
-            'gas': 200000,
-            'gasPrice': contract_wrapper.w3.eth.gas_price
-        })
-        
-        # Sign transaction
-        signed_tx = contract_wrapper.account.sign_transaction(tx)
-        
-        # Send transaction
-        tx_hash = contract_wrapper.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        # Build, sign and send on the web3 thread pool
+        tx_hash = await _run_sync(contract_wrapper.send_register_claim, claim_hash)
         
-        print(f"   Transaction sent: {tx_hash.hex()}")
+        log.info("registerClaim transaction sent: %s", tx_hash.hex())
         
-        # Wait for confirmation
-        receipt = contract_wrapper.w3.eth.wait_for_transaction_receipt(tx_hash)
+        # Wait for confirmation (polls for several seconds - keep it off the loop)
+        receipt = await _run_sync(contract_wrapper.w3.eth.wait_for_transaction_receipt, tx_hash)
         
         if receipt['status'] != 1:
-            print(f"❌ Transaction failed")
-            print(f"{'='*60}\n")
+            log.error("registerClaim transaction %s reverted", tx_hash.hex())
             raise HTTPException(
                 status_code=500,
                 detail="Blockchain transaction failed"
             )
         
-        print(f"✅ Blockchain registration success")
-        print(f"   Block: {receipt['blockNumber']}")
-        print(f"   Gas used: {receipt['gasUsed']}")
+        contract_wrapper.mark_claim_exists(claim_hash)
+        log.info("Claim %s registered in block %d (gas %d)", claim_hash, receipt['blockNumber'], receipt['gasUsed'])
         block_number = receipt['blockNumber']
         
     except Exception as e:
-        print(f"❌ Blockchain registration failed: {str(e)}")
-        print(f"{'='*60}\n")
+        log.error("Blockchain registration failed for %s: %s", claim_hash, e)
         raise HTTPException(
             status_code=500,
             detail=f"Blockchain registration failed: {str(e)}"
         )
     
-    # Step 4: Upload to IPFS
-    print(f"📤 Uploading to IPFS...")
-    try:
-        claim_content = {
-            "claimHash": claim_hash,
-            "newsContent": request.newsContent,
-            "submitter": request.submitterAddress,
-            "timestamp": int(time.time())
-        }
-        
-        content_cid = await ipfs.upload_to_pinata(claim_content)
-        print(f"✅ IPFS upload complete: {content_cid}")
-        
-    except Exception as e:
-        print(f"⚠️  IPFS upload failed (non-blocking): {str(e)}")
-        content_cid = None
+    # Step 4: Store in registry (CID is patched in once the upload finishes)
+    now = int(time.time())
+    entry = ClaimRow(claim_hash, None, request.submitterAddress, block_number, now)
+    await claim_registry.put(entry)
     
-    # Step 5: Store in registry
-    print(f"💾 Storing in registry...")
-    claim_registry[claim_hash] = {
+    # Step 5: Upload to IPFS after the response is sent
+    claim_content = {
         "claimHash": claim_hash,
-        "contentCID": content_cid,
-        "claimSubmitter": request.submitterAddress,
-        "blockNumber": block_number,
-        "timestamp": int(time.time())
+        "newsContent": request.newsContent,
+        "submitter": request.submitterAddress,
+        "timestamp": now
     }
-    print(f"✅ Stored in registry")
+    background_tasks.add_task(_upload_and_patch, entry, claim_content)
     
-    # Step 6: Refresh event cache
-    print(f"🔄 Refreshing event cache...")
-    event_indexer.index_claims_from_events(force_refresh=True)
-    print(f"✅ Event cache refreshed")
+    # Step 6: Add to the event cache (no full re-index needed)
+    event_indexer.add_claim(claim_hash, contract_wrapper.account.address, block_number, tx_hash.hex())
     
-    print(f"✅ Registration complete")
-    print(f"📤 Returned to frontend: {claim_hash}")
-    print(f"{'='*60}\n")
+    log.info("Registration complete: %s (IPFS upload pending)", claim_hash)
     
     return {
         "claimHash": claim_hash,
-        "contentCID": content_cid,
+        "contentCID": None,
         "blockNumber": block_number,
         "claimSubmitter": request.submitterAddress,
         "alreadyExists": False
     }
 
 
+async def _upload_and_patch(entry: ClaimRow, claim_content: dict):
+    """
+    Background task: pin claim content to IPFS and record its CID.
+    Retries with growing delays, since the claim has no content until it lands.
+    """
+    for delay in (*UPLOAD_RETRY_DELAYS, None):
+        try:
+            content_cid = await ipfs.upload_to_pinata(claim_content)
+            break
+        except Exception as e:
+            if delay is None:
+                log.error("IPFS upload failed for %s, giving up: %s", entry.claim_hash, e)
+                return
+            log.warning("IPFS upload failed for %s, retrying in %ds: %s", entry.claim_hash, delay, e)
+            await asyncio.sleep(delay)
+    
+    await claim_registry.put(dataclasses.replace(entry, content_cid=content_cid))
+    log.info("IPFS upload complete for %s: %s", entry.claim_hash, content_cid)
+
+
 @router.post("/claims/register-content")
 async def register_claim_content(request: RegisterClaimRequest):
     """
@@ -258,30 +332,33 @@ async def register_claim_content(request: RegisterClaimRequest):
     Called by frontend after successful on-chain registration.
     """
     claim_hash = request.claimHash
+    submitter = request.submitterAddress or "unknown"
     
-    # Verify claim exists on-chain
-    if not contract_wrapper.claim_exists(claim_hash):
+    # Verify claim exists on-chain; the wallet tx just landed, so a cached
+    # "missing" from an earlier lookup must not be trusted
+    if not await contract_wrapper.async_claim_exists(claim_hash, trust_missing=False):
         raise HTTPException(
             status_code=400,
             detail="Claim not registered on-chain. Register via wallet first."
         )
     
     # Check if already stored in registry
-    if claim_hash in claim_registry:
-        existing = claim_registry[claim_hash]
+    existing = await claim_registry.get(claim_hash)
+    if existing:
         return {
             "claimHash": claim_hash,
-            "contentCID": existing["contentCID"],
-            "blockNumber": existing["blockNumber"],
-            "claimSubmitter": existing["claimSubmitter"]
+            "contentCID": existing.content_cid,
+            "blockNumber": existing.block_number,
+            "claimSubmitter": existing.submitter
         }
     
     # Build claim content object
+    now = int(time.time())
     claim_content = {
         "claimHash": claim_hash,
         "newsContent": request.newsContent,
-        "submitter": request.submitterAddress or "unknown",
-        "timestamp": int(time.time())
+        "submitter": submitter,
+        "timestamp": now
     }
     
     # Upload to IPFS
@@ -294,31 +371,24 @@ async def register_claim_content(request: RegisterClaimRequest):
         )
     
     # Get current block number
-    votes = contract_wrapper.get_votes(claim_hash)
-    block_number = votes["block_number"]
+    block_number = await contract_wrapper.aw3.eth.block_number
     
     # Store in registry
-    claim_registry[claim_hash] = {
-        "claimHash": claim_hash,
-        "contentCID": content_cid,
-        "claimSubmitter": request.submitterAddress or "unknown",
-        "blockNumber": block_number,
-        "timestamp": int(time.time())
-    }
+    await claim_registry.put(ClaimRow(claim_hash, content_cid, submitter, block_number, now))
     
-    # Refresh event cache to include new claim
-    event_indexer.index_claims_from_events(force_refresh=True)
+    # Add to the event cache; the next incremental scan fills in the event details
+    event_indexer.add_claim(claim_hash, submitter, block_number)
     
     return {
         "claimHash": claim_hash,
         "contentCID": content_cid,
         "blockNumber": block_number,
-        "claimSubmitter": request.submitterAddress or "unknown"
+        "claimSubmitter": submitter
     }
 
 
 @router.post("/analyze-claim")
-async def analyze_claim_endpoint(request: AnalyzeRequest):
+async def analyze_claim_endpoint(request: AnalyzeRequest, background_tasks: BackgroundTasks):
     """
     Analyze a claim using claimHash.
     Fetches content from IPFS, gets blockchain data, runs AI analysis.
@@ -326,8 +396,12 @@ async def analyze_claim_endpoint(request: AnalyzeRequest):
     """
     claim_hash = request.claimHash
     
-    # 1. Check if claim exists on-chain
-    exists = contract_wrapper.claim_exists(claim_hash)
+    # 1-2. On-chain existence check and registry lookup are independent;
+    # a cached miss is re-checked so a fresh wallet registration isn't a 404
+    exists, claim_metadata = await asyncio.gather(
+        contract_wrapper.async_claim_exists(claim_hash, trust_missing=False),
+        claim_registry.get(claim_hash)
+    )
     
     if not exists:
         raise HTTPException(
@@ -335,32 +409,91 @@ async def analyze_claim_endpoint(request: AnalyzeRequest):
             detail="Claim not found on blockchain"
         )
     
-    # 2. Get claim content from registry
-    if claim_hash not in claim_registry:
+    if claim_metadata is None:
         raise HTTPException(
             status_code=404,
             detail="Claim content not found. Content must be registered via /claims/register-content"
         )
     
-    claim_metadata = claim_registry[claim_hash]
-    content_cid = claim_metadata["contentCID"]
+    content_cid = claim_metadata.content_cid
+    
+    # 3. Claim text (IPFS), votes and caller metadata are independent - fetch together
+    news_content, (user_votes, validator_votes), (caller_role, has_voted) = await asyncio.gather(
+        _fetch_claim_text(content_cid),
+        multicall.get_all_votes(claim_hash),
+        _caller_metadata(claim_hash, request.callerAddress)
+    )
+    
+    # 4. Reuse the previous snapshot if the votes haven't moved since
+    snapshot_key = (
+        claim_hash,
+        user_votes["true_votes"], user_votes["false_votes"],
+        validator_votes["true_votes"], validator_votes["false_votes"]
+    )
+    cached = _snapshot_cache.get(snapshot_key)
+    if cached is not None:
+        block_number, ai_output, snapshot_hash, snapshot_cid = cached
+    else:
+        block_number, ai_output, snapshot_hash, snapshot_bytes, cacheable = await _build_snapshot(
+            claim_hash, news_content, user_votes, validator_votes
+        )
+        snapshot_cid = None
+        
+        # Degraded AI fallbacks are neither reused nor pinned; the next call retries
+        if cacheable:
+            _snapshot_cache[snapshot_key] = (block_number, ai_output, snapshot_hash, None)
+            
+            # Pin after responding; later analyses of the same votes get the CID
+            background_tasks.add_task(_pin_snapshot, snapshot_key, snapshot_bytes)
+    
+    # 5. Build final response (raw vote counts only)
+    return {
+        "claimHash": claim_hash,
+        "newsContent": news_content,
+        "userTrueVotes": user_votes["true_votes"],
+        "userFalseVotes": user_votes["false_votes"],
+        "validatorTrueVotes": validator_votes["true_votes"],
+        "validatorFalseVotes": validator_votes["false_votes"],
+        "blockNumber": block_number,
+        "aiOutput": ai_output,
+        "snapshotHash": snapshot_hash,
+        "snapshotCID": snapshot_cid,
+        "callerRole": caller_role,
+        "hasVoted": has_voted,
+        "claimSubmitter": claim_metadata.submitter,
+        "timestamp": int(time.time())
+    }
+
+
+async def _fetch_claim_text(content_cid: Optional[str]) -> str:
+    """Claim text from IPFS; unlike _fetch_news_content, failures are a 500."""
+    if not content_cid:
+        # Registered on-chain, but the background upload hasn't finished yet
+        raise HTTPException(
+            status_code=409,
+            detail="Claim content is still being pinned to IPFS, retry shortly"
+        )
     
-    # 3. Fetch claim text from IPFS
     try:
         claim_content = await ipfs.fetch_from_pinata(content_cid)
-        news_content = claim_content.get("newsContent", "")
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch content from IPFS: {str(e)}"
         )
-    
-    # 4. Fetch votes from blockchain
-    user_votes = contract_wrapper.get_votes(claim_hash)
-    validator_votes = contract_wrapper.get_validator_votes(claim_hash)
+    return claim_content.get("newsContent", "")
+
+
+async def _build_snapshot(claim_hash: str, news_content: str, user_votes: dict, validator_votes: dict):
+    """
+    Run AI analysis and build the canonical analysis snapshot.
+    Returns (block_number, ai_output, snapshot_hash, snapshot_bytes, cacheable);
+    pinning the bytes is left to _pin_snapshot. cacheable is False when the
+    AI output is a degraded fallback.
+    """
     block_number = user_votes["block_number"]
     
-    # 5. Prepare votes data for credibility engine
+    # 1. Prepare votes data for credibility engine
     votes_data = {
         "user_votes": {
             "true": user_votes["true_votes"],
@@ -372,13 +505,13 @@ async def analyze_claim_endpoint(request: AnalyzeRequest):
         }
     }
     
-    # 6. Get AI analysis from credibility engine (includes votes analysis)
-    ai_output = await ai_connector.analyze_claim(
+    # 2. Get AI analysis from credibility engine (includes votes analysis)
+    ai_output, cacheable = await ai_connector.analyze_claim_with_status(
         text=news_content,
         votes_data=votes_data
     )
     
-    # 7. Build snapshot (no credibility, no finalStatus)
+    # 3. Build snapshot (no credibility, no finalStatus)
     snapshot = {
         "claimHash": claim_hash,
         "newsContent": news_content,
@@ -394,91 +527,88 @@ async def analyze_claim_endpoint(request: AnalyzeRequest):
         "aiOutput": ai_output
     }
     
-    # 7. Generate snapshot hash (deterministic)
-    snapshot_hash = generate_snapshot_hash(snapshot)
+    # 4. Generate snapshot hash (deterministic); the same bytes get pinned
+    snapshot_hash, snapshot_bytes = generate_snapshot_hash_and_bytes(snapshot)
     
-    # 8. Attempt IPFS upload (non-blocking)
-    snapshot_cid = None
+    return block_number, ai_output, snapshot_hash, snapshot_bytes, cacheable
+
+
+async def _pin_snapshot(snapshot_key: tuple, snapshot_bytes: bytes):
+    """Background task: pin a snapshot and record its CID in the snapshot cache."""
     try:
-        snapshot_cid = await ipfs.upload_to_pinata(snapshot)
+        snapshot_cid = await ipfs.upload_to_pinata(snapshot_bytes)
     except Exception as e:
-        print(f"Snapshot IPFS upload failed (non-blocking): {e}")
-    
-    # 9. Get role metadata if caller provided
-    caller_role = None
-    has_voted = False
-    claim_submitter = claim_metadata["claimSubmitter"]
-    
-    if request.callerAddress:
-        caller_role = contract_wrapper.get_role(request.callerAddress)
-        has_voted = contract_wrapper.has_address_voted(claim_hash, request.callerAddress)
+        log.warning("Snapshot IPFS upload failed (non-blocking): %s", e)
+        # Drop the entry so the next analysis rebuilds and retries the pin
+        _snapshot_cache.pop(snapshot_key, None)
+        return
     
-    # 10. Build final response (raw vote counts only)
-    return {
-        "claimHash": claim_hash,
-        "newsContent": news_content,
-        "userTrueVotes": user_votes["true_votes"],
-        "userFalseVotes": user_votes["false_votes"],
-        "validatorTrueVotes": validator_votes["true_votes"],
-        "validatorFalseVotes": validator_votes["false_votes"],
-        "blockNumber": block_number,
-        "aiOutput": ai_output,
-        "snapshotHash": snapshot_hash,
-        "snapshotCID": snapshot_cid,
-        "callerRole": caller_role,
-        "hasVoted": has_voted,
-        "claimSubmitter": claim_submitter,
-        "timestamp": int(time.time())
-    }
+    cached = _snapshot_cache.get(snapshot_key)
+    if cached is not None:
+        _snapshot_cache[snapshot_key] = (*cached[:3], snapshot_cid)
 
 
 @router.get("/feed")
-async def get_feed():
+async def get_feed(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[int] = Query(None, ge=0)
+):
     """
-    Get all registered claims for feed display using event indexing.
-    Returns list of claims with raw vote counts and Reddit-style scores.
+    Get registered claims for feed display using event indexing.
+    Returns claims with raw vote counts and Reddit-style scores, highest
+    score first. Without limit every claim is returned in one response;
+    with it, pass the returned nextCursor as cursor for the next page.
     No AI calls, no IPFS fetch (except for content if available).
     """
-    # Get indexed claims from blockchain events
-    indexed_claims = event_indexer.get_cached_claims()
-    
-    feed_items = []
+    offset = cursor or 0
     
-    for claim in indexed_claims:
-        claim_hash = claim['claimHash']
-        
-        # Get IPFS CID if available
-        content_cid = None
-        timestamp = None
-        if claim_hash in claim_registry:
-            content_cid = claim_registry[claim_hash].get('contentCID')
-            timestamp = claim_registry[claim_hash].get('timestamp')
-        
-        # If no timestamp from registry, use current time
-        if timestamp is None:
-            timestamp = int(time.time())
-        
-        feed_items.append({
+    # Get indexed claims from blockchain events
+    indexed_claims, total = await event_indexer.get_feed_page(offset, limit)
+    
+    # Reuse the rendered page while neither the index nor the registry changed
+    page_key = (offset, limit, event_indexer.index_version, claim_registry.version)
+    body = _feed_page_cache.get(page_key)
+    if body is not None:
+        return _cached_body(request, body, max_age=5)
+    
+    # One registry query for every claim on the page
+    hashes = [claim['claimHash'] for claim in indexed_claims]
+    registry_entries = await claim_registry.get_many(hashes)
+    entries = [registry_entries.get(claim_hash) for claim_hash in hashes]
+    
+    # Claims without a registry timestamp fall back to a block-derived time,
+    # which (unlike the current time) stays valid inside the cached page
+    feed_items = [
+        {
             "claimHash": claim_hash,
-            "contentCID": content_cid,
+            "contentCID": entry.content_cid if entry else None,
             "claimSubmitter": claim['submitter'],
-            "timestamp": timestamp,
+            "timestamp": entry.timestamp if entry else event_indexer.estimate_block_time(claim['blockNumber']),
             "blockNumber": claim['blockNumber'],
             "userTrueVotes": claim['userTrueVotes'],
             "userFalseVotes": claim['userFalseVotes'],
             "validatorTrueVotes": claim['validatorTrueVotes'],
             "validatorFalseVotes": claim['validatorFalseVotes'],
             "score": claim['score']
-        })
+        }
+        for claim_hash, claim, entry in zip(hashes, indexed_claims, entries)
+    ]
     
-    return {
+    next_offset = offset + len(feed_items)
+    
+    # Plain JSON types only, so skip jsonable_encoder and serialize directly
+    body = orjson.dumps({
         "claims": feed_items,
-        "total": len(feed_items)
-    }
+        "total": total,
+        "nextCursor": next_offset if next_offset < total else None
+    })
+    _feed_page_cache[page_key] = body
+    return _cached_body(request, body, max_age=5)
 
 
 @router.get("/claims/{claim_hash}/detail")
-async def get_claim_detail(claim_hash: str, caller_address: Optional[str] = None):
+async def get_claim_detail(request: Request, claim_hash: ClaimHash, caller_address: Optional[str] = None):
     """
     Get claim detail page data WITHOUT running AI.
     Returns claim text and raw vote counts only.
@@ -487,81 +617,47 @@ async def get_claim_detail(claim_hash: str, caller_address: Optional[str] = None
     FALLBACK SYNC: If claim not in registry but exists on-chain,
     creates minimal registry entry to prevent permanent desync.
     """
-    # Validate hash format
-    if not claim_hash.startswith('0x') or len(claim_hash) != 66:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid hash format. Expected 0x followed by 64 hex characters."
-        )
-    
-    try:
-        bytes.fromhex(claim_hash[2:])
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid hash format. Hash must contain only hexadecimal characters."
-        )
-    
-    # Check if claim exists on-chain FIRST
-    exists = contract_wrapper.claim_exists(claim_hash)
+    # On-chain existence decides the 404 (re-checked live on a cached miss,
+    # so a fresh wallet registration shows up at once); the registry read rides along
+    exists, claim_metadata = await asyncio.gather(
+        contract_wrapper.async_claim_exists(claim_hash, trust_missing=False),
+        claim_registry.get(claim_hash)
+    )
     
     if not exists:
-        print(f"⚠️  Claim does not exist on-chain: {claim_hash}")
+        log.debug("Claim not on-chain: %s", claim_hash)
         raise HTTPException(
             status_code=404,
             detail="Claim not found on blockchain"
         )
     
-    print(f"✅ Claim exists on-chain: {claim_hash}")
-    
-    # Check if in registry
-    if claim_hash not in claim_registry:
-        print(f"⚠️  DESYNC DETECTED: Claim on-chain but not in registry")
-        print(f"🔄 Attempting fallback sync...")
+    if claim_metadata is None:
+        log.warning("Claim %s on-chain but not in registry, running fallback sync", claim_hash)
         
         # FALLBACK SYNC: Create minimal registry entry
         try:
-            # Get submitter from contract
-            submitter = contract_wrapper.get_claim_submitter(claim_hash)
-            votes = contract_wrapper.get_votes(claim_hash)
-            
-            print(f"   Submitter: {submitter}")
-            print(f"   Block: {votes['block_number']}")
+            # Get submitter, votes and caller metadata from contract
+            submitter, (user_votes, validator_votes), (caller_role, has_voted) = await asyncio.gather(
+                _run_sync(contract_wrapper.get_claim_submitter, claim_hash),
+                multicall.get_all_votes(claim_hash),
+                _caller_metadata_or_default(claim_hash, caller_address)
+            )
+            votes = user_votes
+            now = int(time.time())
             
             # Create minimal entry (no content, no CID)
-            claim_registry[claim_hash] = {
-                "claimHash": claim_hash,
-                "contentCID": None,
-                "claimSubmitter": submitter,
-                "blockNumber": votes['block_number'],
-                "timestamp": int(time.time())
-            }
-            
-            print(f"✅ Fallback sync complete - minimal entry created")
-            
-            # Return minimal data
-            user_votes = contract_wrapper.get_votes(claim_hash)
-            validator_votes = contract_wrapper.get_validator_votes(claim_hash)
+            await claim_registry.put(ClaimRow(claim_hash, None, submitter, votes['block_number'], now))
             
-            # Get role metadata if caller provided
-            caller_role = None
-            has_voted = False
-            
-            if caller_address:
-                try:
-                    caller_role = contract_wrapper.get_role(caller_address)
-                    has_voted = contract_wrapper.has_address_voted(claim_hash, caller_address)
-                except Exception as e:
-                    print(f"⚠️  Failed to get caller role: {str(e)}")
-                    caller_role = 0
-                    has_voted = False
+            log.info("Fallback sync created minimal entry for %s (submitter %s)", claim_hash, submitter)
             
+            # One-off response (the next request takes the normal path), and its
+            # timestamp is fresh each time, so no ETag
             return {
                 "claimHash": claim_hash,
                 "newsContent": "[Content not available - claim registered externally]",
                 "contentCID": None,
                 "claimSubmitter": submitter,
-                "timestamp": int(time.time()),
+                "timestamp": now,
                 "blockNumber": votes['block_number'],
                 "userTrueVotes": user_votes["true_votes"],
                 "userFalseVotes": user_votes["false_votes"],
@@ -572,87 +668,51 @@ async def get_claim_detail(claim_hash: str, caller_address: Optional[str] = None
             }
             
         except Exception as e:
-            print(f"❌ Fallback sync failed: {str(e)}")
+            log.error("Fallback sync failed for %s: %s", claim_hash, e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Claim exists on-chain but backend sync failed: {str(e)}"
             )
     
     # Normal flow: claim in registry
-    claim_metadata = claim_registry[claim_hash]
-    content_cid = claim_metadata["contentCID"]
-    
-    # Fetch claim text from IPFS if available
-    news_content = "[Content not available]"
-    if content_cid:
-        try:
-            claim_content = await ipfs.fetch_from_pinata(content_cid)
-            news_content = claim_content.get("newsContent", "[Content not available]")
-        except Exception as e:
-            print(f"⚠️  Failed to fetch content from IPFS: {str(e)}")
-            news_content = "[Content not available - IPFS fetch failed]"
-    
-    # Get vote data using wrapper (safe because we checked exists)
-    print(f"✅ Fetching votes for existing claim: {claim_hash}")
-    user_votes = contract_wrapper.get_votes(claim_hash)
-    validator_votes = contract_wrapper.get_validator_votes(claim_hash)
-    
-    # Get role metadata if caller provided
-    caller_role = None
-    has_voted = False
+    content_cid = claim_metadata.content_cid
     
-    if caller_address:
-        try:
-            caller_role = contract_wrapper.get_role(caller_address)
-            has_voted = contract_wrapper.has_address_voted(claim_hash, caller_address)
-        except Exception as e:
-            print(f"⚠️  Failed to get caller role: {str(e)}")
-            caller_role = 0
-            has_voted = False
+    # IPFS content, votes and caller metadata are independent - fetch together
+    news_content, (user_votes, validator_votes), (caller_role, has_voted) = await asyncio.gather(
+        _fetch_news_content(content_cid),
+        multicall.get_all_votes(claim_hash),
+        _caller_metadata_or_default(claim_hash, caller_address)
+    )
     
-    return {
+    return _cached_json(request, {
         "claimHash": claim_hash,
         "newsContent": news_content,
         "contentCID": content_cid,
-        "claimSubmitter": claim_metadata["claimSubmitter"],
-        "timestamp": claim_metadata["timestamp"],
-        "blockNumber": claim_metadata["blockNumber"],
+        "claimSubmitter": claim_metadata.submitter,
+        "timestamp": claim_metadata.timestamp,
+        "blockNumber": claim_metadata.block_number,
         "userTrueVotes": user_votes["true_votes"],
         "userFalseVotes": user_votes["false_votes"],
         "validatorTrueVotes": validator_votes["true_votes"],
         "validatorFalseVotes": validator_votes["false_votes"],
         "callerRole": caller_role,
         "hasVoted": has_voted
-    }
+    }, max_age=3, private=True)
 
 
 @router.get("/claims/{claim_hash}")
-async def get_claim(claim_hash: str):
+async def get_claim(request: Request, claim_hash: ClaimHash):
     """
     Get claim data from blockchain.
     Returns raw vote counts only, no credibility computation.
     """
-    # Validate hash format
-    if not claim_hash.startswith('0x') or len(claim_hash) != 66:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid hash format. Expected 0x followed by 64 hex characters."
-        )
-    
-    try:
-        bytes.fromhex(claim_hash[2:])
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid hash format. Hash must contain only hexadecimal characters."
-        )
-    
     # Get vote data using wrapper
-    exists = contract_wrapper.claim_exists(claim_hash)
-    user_votes = contract_wrapper.get_votes(claim_hash)
-    validator_votes = contract_wrapper.get_validator_votes(claim_hash)
+    exists, (user_votes, validator_votes) = await asyncio.gather(
+        contract_wrapper.async_claim_exists(claim_hash),
+        multicall.get_all_votes(claim_hash)
+    )
     
-    return {
+    return _cached_json(request, {
         "claim_hash": claim_hash,
         "exists": exists,
         "user_true_votes": user_votes["true_votes"],
@@ -660,7 +720,7 @@ async def get_claim(claim_hash: str):
         "validator_true_votes": validator_votes["true_votes"],
         "validator_false_votes": validator_votes["false_votes"],
         "block_number": user_votes["block_number"]
-    }
+    }, max_age=3)
 
 
 @router.post("/credibility/check")
@@ -683,10 +743,6 @@ async def check_credibility(request: CredibilityCheckRequest):
     - Detailed explanation and flags
     """
     try:
-        print(f"\n🔍 Credibility Check Request:")
-        print(f"   Claim: {request.claim[:100]}...")
-        print(f"   Source URL: {request.source_url}")
-        
         # Call credibility engine
         result = await credibility_engine.score(
             claim=request.claim,
@@ -696,24 +752,22 @@ async def check_credibility(request: CredibilityCheckRequest):
             votes_data=request.votes_data
         )
         
-        # Convert to JSON
-        response_data = result.to_json()
-        
-        print(f"✅ Credibility Check Complete:")
-        print(f"   Verdict: {response_data['verdict']}")
-        print(f"   Score: {response_data['final_score']:.0%}")
-        print(f"   Risk: {response_data['risk_level']}")
+        log.info(
+            "Credibility check: verdict=%s score=%.2f risk=%s",
+            result.verdict, result.final_score, result.risk_level
+        )
         
-        return response_data
+        # Serialize the dataclass directly, skipping asdict + jsonable_encoder
+        return Response(content=result.to_json_bytes(), media_type="application/json")
         
     except ValueError as ve:
-        print(f"❌ Validation error: {ve}")
+        log.warning("Credibility check validation error: %s", ve)
         raise HTTPException(
             status_code=400,
             detail=str(ve)
         )
     except Exception as e:
-        print(f"❌ Credibility check error: {e}")
+        log.error("Credibility check error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to check credibility: {str(e)}"
@@ -724,8 +778,26 @@ async def check_credibility(request: CredibilityCheckRequest):
 async def health():
     """
     Health check endpoint.
+    Reports "warming" until the first event index build has finished.
+    """
+    return {
+        "status": "ok" if event_indexer.is_warm() else "warming",
+        "service": "fake-news-verification-backend",
+        "indexed_block": event_indexer.last_indexed_block,
+        "contract_cache": contract_wrapper.cache_stats(),
+        "rpc_endpoints": contract_wrapper.rpc_pool.stats()
+    }
+
+
+@router.get("/health/breakers")
+async def health_breakers():
+    """
+    Circuit breaker state for external dependencies.
     """
     return {
-        "status": "ok",
-        "service": "fake-news-verification-backend"
+        breaker.name: {
+            "state": breaker.current_state,
+            "failures": breaker.fail_counter
+        }
+        for breaker in (ai_breaker, pinata_breaker)
     }
@@ -0,0 +1,132 @@
+"""
+Latency-aware JSON-RPC endpoint pool with failover.
+Each call goes to the currently fastest healthy endpoint; a transport
+failure marks that endpoint down for a cooldown and retries on the next.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+from web3 import Web3, AsyncHTTPProvider
+from web3.providers.base import JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+
+log = logging.getLogger("thinkbaby.rpc")
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    """HTTP 429 from requests (sync provider) or aiohttp (async provider)."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status", None)
+    return status == 429
+
+
+class EndpointPool:
+    """
+    Tracks an exponential moving average of response time per endpoint.
+    Endpoints that fail are skipped for cooldown_s seconds (rate_limit_s
+    for a 429, which clears quickly), after which the next call that
+    reaches them serves as the health check.
+    """
+
+    def __init__(self, urls: List[str], alpha: float = 0.2, cooldown_s: float = 60, rate_limit_s: float = 5):
+        self.urls = list(urls)
+        self.alpha = alpha
+        self.cooldown_s = cooldown_s
+        self.rate_limit_s = rate_limit_s
+        self._ema: Dict[str, float] = {url: 0.0 for url in self.urls}
+        self._down_until: Dict[str, float] = {url: 0.0 for url in self.urls}
+        self._lock = threading.Lock()  # sync providers are called from worker threads
+
+    def ranked(self) -> List[str]:
+        """Healthy endpoints fastest first, then endpoints in cooldown."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [url for url in self.urls if self._down_until[url] <= now]
+            down = [url for url in self.urls if self._down_until[url] > now]
+            healthy.sort(key=self._ema.__getitem__)
+        return healthy + down
+
+    def record_success(self, url: str, elapsed: float):
+        with self._lock:
+            previous = self._ema[url]
+            self._ema[url] = elapsed if previous == 0.0 else (
+                self.alpha * elapsed + (1 - self.alpha) * previous
+            )
+            self._down_until[url] = 0.0
+
+    def record_failure(self, url: str, exc: Exception):
+        cooldown = self.rate_limit_s if _is_rate_limited(exc) else self.cooldown_s
+        with self._lock:
+            self._down_until[url] = time.monotonic() + cooldown
+        log.warning("RPC endpoint %s failed, cooling down %ds: %s", self.label(url), cooldown, exc)
+
+    def label(self, url: str) -> str:
+        """Name an endpoint without exposing API keys embedded in its URL."""
+        index = self.urls.index(url)
+        return "primary" if index == 0 else f"fallback_{index}"
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                self.label(url): {
+                    "ema_ms": round(self._ema[url] * 1000, 1),
+                    "healthy": self._down_until[url] <= now
+                }
+                for url in self.urls
+            }
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """
+    Sync provider that routes each request through an EndpointPool.
+    JSON-RPC error responses (e.g. reverts) are returned as-is; only
+    transport errors trigger failover.
+    """
+
+    def __init__(self, pool: EndpointPool, session=None):
+        super().__init__()
+        self.pool = pool
+        self._providers = {
+            url: Web3.HTTPProvider(url, session=session if url == pool.urls[0] else None)
+            for url in pool.urls
+        }
+
+    def make_request(self, method, params):
+        last_exc = None
+        for url in self.pool.ranked():
+            start = time.monotonic()
+            try:
+                response = self._providers[url].make_request(method, params)
+            except Exception as e:
+                self.pool.record_failure(url, e)
+                last_exc = e
+                continue
+            self.pool.record_success(url, time.monotonic() - start)
+            return response
+        raise last_exc
+
+
+class AsyncPooledHTTPProvider(AsyncJSONBaseProvider):
+    """Async counterpart of PooledHTTPProvider for AsyncWeb3."""
+
+    def __init__(self, pool: EndpointPool):
+        super().__init__()
+        self.pool = pool
+        self._providers = {url: AsyncHTTPProvider(url) for url in pool.urls}
+
+    async def make_request(self, method, params):
+        last_exc = None
+        for url in self.pool.ranked():
+            start = time.monotonic()
+            try:
+                response = await self._providers[url].make_request(method, params)
+            except Exception as e:
+                self.pool.record_failure(url, e)
+                last_exc = e
+                continue
+            self.pool.record_success(url, time.monotonic() - start)
+            return response
+        raise last_exc
@@ -65,6 +65,14 @@ def generate_snapshot_hash(snapshot: dict) -> str:
     """
     Generate deterministic hash of snapshot using canonical JSON serialization.
     """
-    snapshot_json = json.dumps(snapshot, sort_keys=True, separators=(',', ':'))
-    snapshot_bytes = snapshot_json.encode('utf-8')
-    return Web3.keccak(snapshot_bytes).hex()
+    return generate_snapshot_hash_and_bytes(snapshot)[0]
+
+
+def generate_snapshot_hash_and_bytes(snapshot: dict) -> tuple:
+    """
+    Serialize snapshot canonically once and hash it.
+    Returns (hash, canonical_bytes) so callers can upload the same bytes.
+    Stays on stdlib json: its escaping defines existing snapshot hashes.
+    """
+    snapshot_bytes = json.dumps(snapshot, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return Web3.keccak(snapshot_bytes).hex(), snapshot_bytes
@@ -1,6 +1,11 @@
+import functools
+import re
 from web3 import Web3
 
 
+_HASH_RE = re.compile(r"0x[0-9a-fA-F]{64}")
+
+
 def normalize_text(text: str) -> str:
     """
     Normalize text using deterministic rules.
@@ -9,6 +14,9 @@ def normalize_text(text: str) -> str:
     return " ".join(text.lower().strip().split())
 
 
+# Resubmits of the same text are common. Keyed on the raw text, which the
+# request models cap at 10k chars, so the cache stays within ~10 MB
+@functools.lru_cache(maxsize=1024)
 def hash_claim(text: str) -> str:
     """
     Generate keccak256 hash of normalized text.
@@ -23,6 +31,10 @@ def validate_hash_format(hash_str: str) -> None:
     Validate hash format.
     Raises ValueError if invalid.
     """
+    # Fast path for well-formed hashes; the checks below only explain failures
+    if _HASH_RE.fullmatch(hash_str):
+        return
+    
     if not hash_str.startswith('0x'):
         raise ValueError("Hash must start with 0x")
     if len(hash_str) != 66:
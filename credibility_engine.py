@@ -15,10 +15,14 @@ import json
 import math
 import hashlib
 import asyncio
+import functools
+import time
+from collections import OrderedDict
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from typing import Optional
 import httpx
+import orjson
 
 # ─────────────────────────────────────────────
 # SOURCE CREDIBILITY REGISTRY
@@ -47,43 +51,63 @@ TIER_2_DOMAINS = {
     "dw.com", "abc.net.au",
 }
 
-GOV_PATTERNS = [r"\.gov\.in$", r"\.nic\.in$", r"\.gov\.in/", r"uidai\.gov\.in"]
+GOV_PATTERNS = [re.compile(p) for p in (r"\.gov\.in$", r"\.nic\.in$", r"\.gov\.in/", r"uidai\.gov\.in")]
 
 # ─────────────────────────────────────────────
 # LINGUISTIC MISINFORMATION SIGNALS
+# Compiled once at import, case-insensitive
 # ─────────────────────────────────────────────
 
-CLICKBAIT_PATTERNS = [
+CLICKBAIT_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
     r"\bbreaking\b", r"\bshocking\b", r"\bviral\b", r"\bexclusive\b",
     r"\bsecret\b", r"\bhidden\b", r"\bthey don.t want you\b",
     r"\byou won.t believe\b", r"\bfree money\b", r"\binstant\b",
     r"\bguaranteed\b", r"100%\s*(free|cash|money)",
-]
+)]
 
-URGENCY_PATTERNS = [
+URGENCY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
     r"(act now|limited time|expires today|last chance|hurry)",
     r"(claim (your|now|immediately))",
     r"(don.t miss|share immediately|forward to all)",
-]
+)]
 
-NUMERICAL_ANOMALY_PATTERNS = [
+NUMERICAL_ANOMALY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
     r"₹\s*[\d,]+\s*(lakh|crore|lakhs|crores)",  # Large amounts
     r"\b(every|each)\s+(citizen|indian|person)\b",
     r"\b(free|subsidy)\s+of\s+₹",
-]
+)]
 
-SCHEME_IMPERSONATION = [
+SCHEME_IMPERSONATION = [re.compile(p, re.IGNORECASE) for p in (
     r"pm\s*(modi|cares|kisan|awas|ujjwala|jan dhan)",
     r"(pradhan mantri|sarkar|government)\s+(is giving|is offering|will give)",
     r"(aadhar|ration card|voter id)\s+(linked|required|mandatory)\s+(for|to get)",
-]
+)]
+
+BREAKING_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"\bbreaking\b", r"\bjust in\b", r"\blive\b", r"\bunfolding\b",
+)]
+
+# Headline per verdict in the WhatsApp explanation
+VERDICT_MESSAGES = {
+    "TRUE": "✅ Claim appears credible",
+    "FALSE": "❌ Claim likely false or misleading",
+    "UNCERTAIN": "⚠️ Insufficient evidence to verify",
+    "UNVERIFIED": "🔍 Claim could not be verified against known sources",
+    "BREAKING": "⏳ Breaking news — verification pending",
+}
+
+_AMOUNT_RE = re.compile(r"₹\s*([\d,]+)")
+_PCT_RE = re.compile(r"(\d+)\s*%")
+_YEAR_RE = re.compile(r"\b(20[0-1][0-9])\b")
+_HTTP_RE = re.compile(r"^https?://")
+_WWW_RE = re.compile(r"^www\.")
 
 
 # ─────────────────────────────────────────────
 # DATA STRUCTURES
 # ─────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CredibilityResult:
     claim: str
     claim_hash: str
@@ -116,6 +140,10 @@ class CredibilityResult:
     def to_json(self) -> dict:
         return asdict(self)
 
+    def to_json_bytes(self) -> bytes:
+        # orjson serializes dataclasses natively, no asdict() copy
+        return orjson.dumps(self)
+
 
 # ─────────────────────────────────────────────
 # MAIN ENGINE
@@ -169,6 +197,10 @@ class CredibilityEngine:
         # Confidence calibration: Platt Scaling approximation
         self._platt_a = -1.8
         self._platt_b = 0.5
+        # LRU of results keyed on a digest of every score() input; viral
+        # claims arrive many times with the same context and votes
+        self._result_cache = OrderedDict()
+        self._result_cache_size = 4096
 
     # ──────────────────────────────────────────
     # PUBLIC API
@@ -187,10 +219,17 @@ class CredibilityEngine:
             result = await engine.score(claim, source_url, rag_ctx, web_ctx, votes)
             print(result.to_json())
         """
-        t_start = datetime.utcnow()
+        t_start = time.perf_counter_ns()
+        timestamp = datetime.utcnow().isoformat()
 
         claim = claim.strip()
-        claim_hash = self._hash_claim(claim)
+        cache_key = self._cache_key(claim, source_url, rag_context, web_context, votes_data)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+            return _detached(cached, timestamp=timestamp, processing_ms=0)
+
+        claim_hash = _hash_claim(claim)
         flags = []
 
         # ── Layer 1: Source Score ─────────────────
@@ -235,10 +274,9 @@ class CredibilityEngine:
             source_score, linguistic_score, numerical_score, rag_score
         )
 
-        t_end = datetime.utcnow()
-        ms = int((t_end - t_start).total_seconds() * 1000)
+        ms = (time.perf_counter_ns() - t_start) // 1_000_000
 
-        return CredibilityResult(
+        result = CredibilityResult(
             claim=claim,
             claim_hash=claim_hash,
             source_score=round(source_score, 3),
@@ -254,10 +292,15 @@ class CredibilityEngine:
             flags=list(set(flags)),
             sources_found=sources_found,
             explanation=explanation,
-            timestamp=t_start.isoformat(),
+            timestamp=timestamp,
             processing_ms=ms,
         )
 
+        self._result_cache[cache_key] = _detached(result)
+        if len(self._result_cache) > self._result_cache_size:
+            self._result_cache.popitem(last=False)
+        return result
+
     # ──────────────────────────────────────────
     # LAYER 1: SOURCE CLASSIFIER
     # ──────────────────────────────────────────
@@ -268,14 +311,14 @@ class CredibilityEngine:
         sources_found = []
 
         if source_url:
-            domain = self._extract_domain(source_url)
+            domain = _extract_domain(source_url)
             if domain in TIER_1_DOMAINS:
                 score = 0.92
                 sources_found.append({"domain": domain, "tier": 1})
             elif domain in TIER_2_DOMAINS:
                 score = 0.72
                 sources_found.append({"domain": domain, "tier": 2})
-            elif any(re.search(p, domain) for p in GOV_PATTERNS):
+            elif any(p.search(domain) for p in GOV_PATTERNS):
                 score = 0.88
                 sources_found.append({"domain": domain, "tier": "gov"})
                 flags.append("government_source_detected")
@@ -285,10 +328,12 @@ class CredibilityEngine:
 
         # Scan web context for trusted domain mentions
         if web_context:
+            seen = {s["domain"] for s in sources_found}
             for domain in TIER_1_DOMAINS:
                 if domain in web_context:
                     score = max(score, 0.78)
-                    if domain not in [s.get("domain") for s in sources_found]:
+                    if domain not in seen:
+                        seen.add(domain)
                         sources_found.append({"domain": domain, "tier": "web_mention"})
 
         if not sources_found:
@@ -307,19 +352,18 @@ class CredibilityEngine:
         """
         score = 1.0
         flags = []
-        text = claim.lower()
 
-        clickbait_hits = sum(1 for p in CLICKBAIT_PATTERNS if re.search(p, text))
+        clickbait_hits = sum(1 for p in CLICKBAIT_PATTERNS if p.search(claim))
         if clickbait_hits > 0:
             score -= min(0.35, clickbait_hits * 0.12)
             flags.append(f"clickbait_language:{clickbait_hits}_signals")
 
-        urgency_hits = sum(1 for p in URGENCY_PATTERNS if re.search(p, text))
+        urgency_hits = sum(1 for p in URGENCY_PATTERNS if p.search(claim))
         if urgency_hits > 0:
             score -= min(0.25, urgency_hits * 0.10)
             flags.append("urgency_manipulation")
 
-        scheme_hits = sum(1 for p in SCHEME_IMPERSONATION if re.search(p, text))
+        scheme_hits = sum(1 for p in SCHEME_IMPERSONATION if p.search(claim))
         if scheme_hits > 0:
             score -= min(0.30, scheme_hits * 0.12)
             flags.append("scheme_impersonation_suspected")
@@ -344,10 +388,9 @@ class CredibilityEngine:
         """
         score = 1.0
         flags = []
-        text = claim.lower()
 
         # Extract all monetary amounts
-        amounts = re.findall(r'₹\s*([\d,]+)', text)
+        amounts = _AMOUNT_RE.findall(claim)
         for amt_str in amounts:
             amt = int(amt_str.replace(",", ""))
             # Implausibly large direct transfer
@@ -360,13 +403,13 @@ class CredibilityEngine:
 
         # "Every citizen" type universal claims
         for p in NUMERICAL_ANOMALY_PATTERNS:
-            if re.search(p, text):
+            if p.search(claim):
                 score -= 0.20
                 flags.append("universal_benefit_claim")
                 break
 
         # Percentage anomalies
-        pcts = re.findall(r'(\d+)\s*%', text)
+        pcts = _PCT_RE.findall(claim)
         for pct in pcts:
             if int(pct) > 90:
                 score -= 0.10
@@ -392,14 +435,14 @@ class CredibilityEngine:
             return 0.4, flags
 
         # Keyword overlap approximation (real implementation uses vector similarity)
+        context_lower = rag_context.lower()
         claim_words = set(claim.lower().split())
-        context_words = set(rag_context.lower().split())
-        overlap = len(claim_words & context_words) / max(len(claim_words), 1)
+        overlap = len(claim_words.intersection(context_lower.split())) / max(len(claim_words), 1)
 
         score = min(0.95, 0.4 + overlap * 0.8)
 
         # Fraud indicators in RAG context
-        if any(w in rag_context.lower() for w in ["fraud", "fake", "scam", "false", "hoax"]):
+        if any(w in context_lower for w in ("fraud", "fake", "scam", "false", "hoax")):
             score = max(0.0, score - 0.40)
             flags.append("database_fraud_indicator")
 
@@ -419,16 +462,14 @@ class CredibilityEngine:
         """
         score = 0.75  # default
         flags = []
-        text = claim.lower()
 
-        breaking_patterns = [r"\bbreaking\b", r"\bjust in\b", r"\blive\b", r"\bunfolding\b"]
-        if any(re.search(p, text) for p in breaking_patterns):
+        if any(p.search(claim) for p in BREAKING_PATTERNS):
             score = 0.45
             flags.append("breaking_news_unverified")
 
         # Year extraction — recycled old news detection
-        years = re.findall(r'\b(20[0-1][0-9])\b', text)
-        current_year = datetime.utcnow().year
+        years = _YEAR_RE.findall(claim)
+        current_year = time.gmtime().tm_year
         for yr in years:
             if int(yr) < current_year - 2:
                 score -= 0.15
@@ -553,14 +594,7 @@ class CredibilityEngine:
         """Produces human-readable explanation for WhatsApp output."""
         parts = []
 
-        verdict_map = {
-            "TRUE": "✅ Claim appears credible",
-            "FALSE": "❌ Claim likely false or misleading",
-            "UNCERTAIN": "⚠️ Insufficient evidence to verify",
-            "UNVERIFIED": "🔍 Claim could not be verified against known sources",
-            "BREAKING": "⏳ Breaking news — verification pending",
-        }
-        parts.append(verdict_map.get(verdict, "❓ Unknown"))
+        parts.append(VERDICT_MESSAGES.get(verdict, "❓ Unknown"))
         parts.append(f"Credibility Score: {score:.0%} | Confidence: {confidence:.0%}")
 
         # Layer breakdown
@@ -581,14 +615,44 @@ class CredibilityEngine:
     # UTILITIES
     # ──────────────────────────────────────────
 
-    def _hash_claim(self, claim):
-        return "0x" + hashlib.sha256(claim.encode()).hexdigest()[:40]
+    def _cache_key(self, claim, source_url, rag_context, web_context, votes_data):
+        # Votes are part of the key, so new community votes miss the cache
+        material = "|".join([
+            claim,
+            source_url or "",
+            rag_context or "",
+            web_context or "",
+            json.dumps(votes_data, sort_keys=True) if votes_data else "",
+        ])
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).digest()
+
+
+# ─────────────────────────────────────────────
+# MEMOIZED HELPERS
+# Pure string functions; forwarded claims and source URLs repeat a lot
+# ─────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=8192)
+def _hash_claim(claim):
+    return "0x" + hashlib.sha256(claim.encode()).hexdigest()[:40]
+
+
+def _detached(result, **changes):
+    # Copy of a cached result that shares no mutable list or dict with it
+    return replace(
+        result,
+        flags=list(result.flags),
+        sources_found=[dict(s) for s in result.sources_found],
+        **changes,
+    )
+
 
-    def _extract_domain(self, url):
-        url = url.lower().strip()
-        url = re.sub(r'^https?://', '', url)
-        url = re.sub(r'^www\.', '', url)
-        return url.split('/')[0].split('?')[0]
+@functools.lru_cache(maxsize=8192)
+def _extract_domain(url):
+    url = url.lower().strip()
+    url = _HTTP_RE.sub('', url)
+    url = _WWW_RE.sub('', url)
+    return url.split('/')[0].split('?')[0]
 
 
 # ─────────────────────────────────────────────
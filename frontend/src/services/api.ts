@@ -35,6 +35,7 @@ export interface FeedClaim {
 export interface FeedResponse {
   claims: FeedClaim[];
   total: number;
+  nextCursor: number | null;
 }
 
 export interface RoleInfo {
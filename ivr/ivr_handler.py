@@ -4,6 +4,7 @@ Handles voice calls via Twilio
 Converts speech to text, verifies claims, and responds with voice
 """
 
+import asyncio
 import os
 from fastapi import FastAPI, Form, Request
 from fastapi.responses import Response
@@ -16,7 +17,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.claim_extractor import analyze_message
 from modules.hash_generator import generate_claim_hash
-from modules.backend_client import submit_claim_to_backend, get_claim_result, claim_exists
+from modules.backend_client import submit_claim_to_backend, get_claim_result
 from utils.formatter import format_ivr_response, format_error_message
 
 # Load environment variables
@@ -53,17 +54,16 @@ async def process_voice_claim(claim_text: str) -> str:
         claim_hash = generate_claim_hash(main_claim)
         print(f"[IVR] Generated hash: {claim_hash}")
         
-        # Check if claim exists
-        exists = claim_exists(claim_hash)
+        # Get blockchain result; its "exists" flag doubles as the existence check.
+        # backend_client uses blocking requests, so keep it off the event loop
+        print("[IVR] Fetching verification result...")
+        blockchain_result = await asyncio.to_thread(get_claim_result, claim_hash)
         
-        if not exists:
-            # Submit new claim
+        if blockchain_result.get("success") and not blockchain_result.get("exists"):
+            # Submit new claim, then read back its (fresh) result
             print("[IVR] Submitting new claim...")
-            await submit_claim_to_backend(claim_hash, main_claim)
-        
-        # Get blockchain result
-        print("[IVR] Fetching verification result...")
-        blockchain_result = get_claim_result(claim_hash)
+            await asyncio.to_thread(submit_claim_to_backend, claim_hash, main_claim)
+            blockchain_result = await asyncio.to_thread(get_claim_result, claim_hash)
         
         if not blockchain_result.get("success"):
             return "Sorry, our verification system is temporarily unavailable. Please try again later."
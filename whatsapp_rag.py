@@ -11,8 +11,10 @@ Features:
 """
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, ORJSONResponse
 from twilio.twiml.messaging_response import MessagingResponse
+from twilio.rest import Client as TwilioClient
+import asyncio
 import os
 import sys
 import json
@@ -41,7 +43,7 @@ from credibility_engine import CredibilityEngine
 load_dotenv()
 
 # Initialize FastAPI
-app = FastAPI(title="WhatsApp RAG Bot")
+app = FastAPI(title="WhatsApp RAG Bot", default_response_class=ORJSONResponse)
 
 # Initialize RAG system with CSV data
 print("🚀 Initializing WhatsApp Bot with RAG...")
@@ -72,6 +74,17 @@ gemini_client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
 PINATA_API_KEY = os.getenv("PINATA_API_KEY", "")
 PINATA_SECRET_KEY = os.getenv("PINATA_SECRET_KEY", "")
 
+# Twilio REST client for replies sent after the webhook has returned
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER", "whatsapp:+14155238886")
+twilio_client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN) if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN else None
+if not twilio_client:
+    print("⚠️ WARNING: Twilio credentials not set - fact-checks will reply inline")
+
+# Strong references to in-flight reply tasks (the loop only keeps weak ones)
+_reply_tasks = set()
+
 # Backend API Configuration
 BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:3000/api")
 
@@ -909,6 +922,37 @@ def handle_query(query: str) -> str:
         return "⚠️ Sorry, I encountered an error processing your request. Please try again."
 
 
+async def _store_and_trim(user_number: str, user_message: str, reply: str) -> str:
+    """Truncate reply to the WhatsApp limit and store the exchange on IPFS."""
+    if len(reply) > 1600:
+        reply = reply[:1597] + "..."
+    
+    try:
+        ipfs_cid = await upload_conversation_to_ipfs(user_number, user_message, reply)
+        if ipfs_cid:
+            print(f"📦 Conversation stored on IPFS: {ipfs_cid}")
+    except Exception as ipfs_error:
+        print(f"⚠️ IPFS storage failed (non-blocking): {ipfs_error}")
+    
+    return reply
+
+
+async def _process_and_reply(user_number: str, user_message: str):
+    """Run the fact-check after the webhook has returned and reply via the REST API."""
+    try:
+        reply = await handle_factcheck_multilingual(user_message)
+        reply = await _store_and_trim(user_number, user_message, reply)
+        await asyncio.to_thread(
+            twilio_client.messages.create,
+            from_=TWILIO_WHATSAPP_NUMBER,
+            to=user_number,
+            body=reply
+        )
+        print(f"📤 Sent {len(reply)} chars to {user_number}")
+    except Exception as e:
+        print(f"❌ Background fact-check failed for {user_number}: {e!r}")
+
+
 @app.post("/webhook/whatsapp")
 @app.post("/webhook")  # Also handle /webhook (without /whatsapp)
 async def whatsapp_webhook(
@@ -940,22 +984,21 @@ async def whatsapp_webhook(
             
             if command_response:
                 reply = command_response
+            elif twilio_client:
+                # Fact-checks can outlast Twilio's 15s webhook timeout:
+                # ack now, send the result through the REST API when ready
+                print("🔍 Routing to multilingual fact-check (background)...")
+                task = asyncio.create_task(_process_and_reply(user_number, user_message))
+                _reply_tasks.add(task)
+                task.add_done_callback(_reply_tasks.discard)
+                return Response(content=str(MessagingResponse()), media_type="application/xml")
             else:
                 # ALL non-command queries trigger comprehensive fact-check
                 print("🔍 Routing to multilingual fact-check...")
                 reply = await handle_factcheck_multilingual(user_message)
         
-        # Truncate if too long (WhatsApp limit)
-        if len(reply) > 1600:
-            reply = reply[:1597] + "..."
-        
-        # Store conversation to IPFS (async background task)
-        try:
-            ipfs_cid = await upload_conversation_to_ipfs(user_number, user_message, reply)
-            if ipfs_cid:
-                print(f"📦 Conversation stored on IPFS: {ipfs_cid}")
-        except Exception as ipfs_error:
-            print(f"⚠️ IPFS storage failed (non-blocking): {ipfs_error}")
+        # Truncate (WhatsApp limit) and store conversation to IPFS
+        reply = await _store_and_trim(user_number, user_message, reply)
         
         # Create TwiML response
         twiml = create_twiml_response(reply)